@@ -4,9 +4,29 @@ import tkinter as tk
 import threading
 import time
 import webbrowser
+import json
+import base64
+import queue
+import csv
+import argparse
+import bisect
+import heapq
+import cProfile
+import pstats
+import tracemalloc
+import functools
+import io
+import contextlib
+import itertools
+import struct
+import random
+import concurrent.futures
+import multiprocessing
+
+from collections import OrderedDict, defaultdict, deque
 
 from dotenv import load_dotenv
-from tkinter import ttk, messagebox, Menu
+from tkinter import ttk, messagebox, filedialog, simpledialog, Menu
 
 load_dotenv()
 
@@ -30,7 +50,7 @@ REGION_DATA = {
         "league_region": "eun1",
     },
     "Korea": {
-        "acount_region": "asia",
+        "account_region": "asia",
         "match_region": "asia",
         "league_region": "kr",
     },
@@ -109,6 +129,11 @@ def get_league_api_url(region_name):
     return f"https://{region['league_region']}.api.riotgames.com/lol/league/v4/"
 
 
+def get_spectator_api_url(region_name):
+    region = REGION_DATA[region_name]
+    return f"https://{region['league_region']}.api.riotgames.com/lol/spectator/v5/"
+
+
 app_version = "v0.1.2"
 
 if not api_key:
@@ -120,6 +145,2346 @@ if not api_key:
 # Module-level username/tagline variables (set by the GUI)
 username = ""
 tagline = ""
+current_region = DEFAULT_REGION
+
+# Local data directory (static data bundle, caches)
+DATA_DIR = os.getenv("DATA_DIR") or os.path.join(
+    os.path.expanduser("~"), ".simplelolapi"
+)
+PROFILES_DIR = os.path.join(DATA_DIR, "profiles")
+
+_NO_PHASE = contextlib.nullcontext()
+
+
+class _ProfileCapture:
+    """One profiled action: cProfile, tracemalloc and per-phase wall time."""
+
+    def __init__(self, action, out_dir):
+        self.action = action
+        self.out_dir = out_dir
+        now = time.time()
+        # Milliseconds too, two quick runs of an action mustn't share a file name
+        self.stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + (
+            f"-{int(now * 1000) % 1000:03d}"
+        )
+        self.phases = defaultdict(float)
+        self._phase_lock = threading.Lock()
+        self.profile = cProfile.Profile()
+        self.started_tracemalloc = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracemalloc = True
+        tracemalloc.reset_peak()
+        self.mem_before = tracemalloc.take_snapshot()
+        self.start_time = time.perf_counter()
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+        self.wall = time.perf_counter() - self.start_time
+        self.mem_after = tracemalloc.take_snapshot()
+        self.mem_peak = tracemalloc.get_traced_memory()[1]
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+
+    def add_time(self, phase, seconds):
+        with self._phase_lock:
+            self.phases[phase] += seconds
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def timed(self, name, func):
+        """Wrap func so its run time counts toward a phase, wherever it runs."""
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add_time(name, time.perf_counter() - start)
+
+        return wrapper
+
+    def write(self):
+        """Dump the profile and a text summary, returns the summary."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, f"{self.stamp}_{self.action}")
+        n = 1
+        while os.path.exists(base + ".prof"):
+            n += 1
+            base = os.path.join(self.out_dir, f"{self.stamp}_{self.action}_{n}")
+        self.profile.dump_stats(base + ".prof")
+
+        lines = [f"Action: {self.action}  ({self.stamp})"]
+        lines.append(f"Wall time: {self.wall:.3f}s")
+        lines.append("")
+        lines.append("Phases:")
+        # ui runs on the Tk thread, outside the worker's wall time
+        worker_phases = sum(t for p, t in self.phases.items() if p != "ui")
+        phases = dict(self.phases)
+        phases["python"] = max(self.wall - worker_phases, 0.0)
+        for phase, seconds in sorted(phases.items(), key=lambda p: -p[1]):
+            lines.append(f"  {phase:<10} {seconds * 1000:10.1f} ms")
+
+        stream = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=stream)
+        stats.sort_stats("tottime").print_stats(15)
+        lines.append("")
+        lines.append("Top functions by own time:")
+        lines.extend(
+            "  " + line for line in stream.getvalue().splitlines() if line.strip()
+        )
+
+        lines.append("")
+        lines.append(f"Allocations (peak {self.mem_peak / 1024:.0f} KiB):")
+        for stat in self.mem_after.compare_to(self.mem_before, "lineno")[:10]:
+            lines.append(f"  {stat}")
+
+        summary = "\n".join(lines)
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(summary)
+        print(f"Profile written to {base}.prof")
+        return summary
+
+
+class ActionProfiler:
+    """Profiles the next N GUI actions, does nothing at all while disarmed."""
+
+    def __init__(self, out_dir=PROFILES_DIR):
+        self.out_dir = out_dir
+        self.remaining = 0
+        self.summaries = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def arm(self, count):
+        self.remaining = count
+
+    def disarm(self):
+        self.remaining = 0
+
+    def current(self):
+        """The capture running on this thread, if any."""
+        return getattr(self._local, "capture", None)
+
+    def phase(self, name):
+        capture = getattr(self._local, "capture", None)
+        if capture is None:
+            return _NO_PHASE
+        return capture.phase(name)
+
+    def begin(self, action):
+        # cProfile can only have one profiler active, a second action just runs
+        if not self._lock.acquire(blocking=False):
+            return None
+        if self.remaining <= 0:
+            self._lock.release()
+            return None
+        self.remaining -= 1
+        capture = _ProfileCapture(action, self.out_dir)
+        try:
+            capture.start()
+        except ValueError as e:
+            print(f"Could not start profiler: {e}")
+            self._lock.release()
+            return None
+        self._local.capture = capture
+        return capture
+
+    def end(self, capture):
+        self._local.capture = None
+        try:
+            capture.stop()
+        finally:
+            self._lock.release()
+
+    def finish(self, capture):
+        summary = capture.write()
+        self.summaries.append(summary)
+        del self.summaries[:-20]
+        return summary
+
+
+profiler = ActionProfiler()
+
+# Development key limits: 20 requests every 1s, 100 requests every 2 minutes
+DEFAULT_RATE_LIMITS = "20:1,100:120"
+
+
+def parse_rate_limits(text):
+    """[(requests, seconds)] from Riot's "20:1,100:120" rate limit format."""
+    limits = []
+    for part in text.split(","):
+        count, _, seconds = part.strip().partition(":")
+        limits.append((int(count), float(seconds)))
+    if not limits or any(c <= 0 or s <= 0 for c, s in limits):
+        raise ValueError(text)
+    return limits
+
+
+# Production keys have higher limits, set RATE_LIMITS to the key's own
+try:
+    RATE_LIMITS = parse_rate_limits(os.getenv("RATE_LIMITS") or DEFAULT_RATE_LIMITS)
+except ValueError:
+    print(f"Invalid RATE_LIMITS, using {DEFAULT_RATE_LIMITS}")
+    RATE_LIMITS = parse_rate_limits(DEFAULT_RATE_LIMITS)
+
+
+# Priority classes for Riot API calls, lower is served first
+PRIORITY_INTERACTIVE = 0  # the user clicked something and is waiting
+PRIORITY_NORMAL = 1  # user started, but long running (Analyze All)
+PRIORITY_BACKGROUND = 2  # nobody is waiting (watch polling, prefetch)
+
+# Share of each window only higher priorities may use
+PRIORITY_RESERVE = {
+    PRIORITY_INTERACTIVE: 0.0,
+    PRIORITY_NORMAL: 0.2,
+    PRIORITY_BACKGROUND: 0.4,
+}
+
+# Background calls wait this long after the last interactive call
+BACKGROUND_HOLD = 2.0
+
+
+class RateBudget:
+    """Sliding window request budget shared by every Riot API call in the process.
+
+    Callers are served by priority: nothing goes out while a higher priority
+    call is waiting, lower priorities leave part of every window free, and
+    background calls are held back while the user is actively clicking.
+    """
+
+    def __init__(self, limits=RATE_LIMITS):
+        self.limits = limits
+        self._cond = threading.Condition()
+        self._sent = deque()  # send times, as long as the longest window
+        self._waiting = defaultdict(int)  # priority -> callers waiting
+        self._hold_until = 0.0
+
+    def _wait_time(self, now, priority):
+        wait = 0.0
+        for limit, window in self.limits:
+            allowed = max(1, int(limit * (1 - PRIORITY_RESERVE[priority])))
+            in_window = [t for t in self._sent if t > now - window]
+            if len(in_window) >= allowed:
+                wait = max(wait, in_window[-allowed] + window - now)
+        if priority == PRIORITY_BACKGROUND:
+            wait = max(wait, self._hold_until - now)
+        return wait
+
+    def acquire(self, priority=PRIORITY_NORMAL):
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    longest = max(window for _, window in self.limits)
+                    while self._sent and self._sent[0] <= now - longest:
+                        self._sent.popleft()
+                    if any(self._waiting[p] for p in range(priority)):
+                        # A higher priority caller goes first, it notifies when done
+                        self._cond.wait(0.5)
+                        continue
+                    wait = self._wait_time(now, priority)
+                    if wait <= 0:
+                        self._sent.append(now)
+                        if priority == PRIORITY_INTERACTIVE:
+                            self._hold_until = now + BACKGROUND_HOLD
+                        return
+                    self._cond.wait(wait)
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+
+
+rate_budget = RateBudget()
+
+
+def riot_get(url, timeout=10, priority=PRIORITY_NORMAL, **kwargs):
+    """requests.get for Riot endpoints, paced by the shared rate budget.
+
+    priority is one of the PRIORITY_ classes. A 429 is retried once after the
+    Retry-After the API asks for.
+    """
+    for attempt in range(2):
+        with profiler.phase("rate wait"):
+            rate_budget.acquire(priority)
+        with profiler.phase("network"):
+            response = requests.get(url, timeout=timeout, **kwargs)
+        capture = profiler.current()
+        if capture is not None:
+            response.json = capture.timed("decode", response.json)
+        if response.status_code != 429 or attempt:
+            return response
+        retry_after = float(response.headers.get("Retry-After", 1))
+        print(f"Rate limited, retrying in {retry_after}s")
+        time.sleep(retry_after)
+
+
+STATIC_DATA_DIR = os.path.join(DATA_DIR, "static")
+
+DDRAGON_BASE = "https://ddragon.leagueoflegends.com"
+QUEUES_URL = "https://static.developer.riotgames.com/docs/lol/queues.json"
+
+# Short names for the common queues, the bundle's descriptions are used for the rest
+QUEUE_NAMES = {
+    420: "Ranked Solo/Duo",
+    440: "Ranked Flex",
+    400: "Normal Draft",
+    430: "Normal Blind",
+    450: "ARAM",
+}
+
+
+def _version_key(version):
+    parts = []
+    for p in version.split("."):
+        parts.append(int(p) if p.isdigit() else 0)
+    return tuple(parts)
+
+
+class StaticData:
+    """Versioned champion/item/spell/rune/queue metadata from a local Data Dragon bundle.
+
+    The bundle lives in STATIC_DATA_DIR/<version>/ and holds the Data Dragon json
+    files as downloaded. Lookups are plain dict indexes built once by load().
+    """
+
+    BUNDLE_FILES = [
+        "champion.json",
+        "item.json",
+        "summoner.json",
+        "runesReforged.json",
+        "queues.json",
+    ]
+
+    def __init__(self, base_dir=STATIC_DATA_DIR):
+        self.base_dir = base_dir
+        self.version = None
+        self.champions = {}  # champion key (int) -> metadata
+        self.champions_by_name = {}  # champion id ("MonkeyKing") -> metadata
+        self.champions_by_key = {}  # champion_key of id and display name -> metadata
+        self.items = {}
+        self.summoner_spells = {}
+        self.runes = {}
+        self.queues = {}
+
+    def available_versions(self):
+        if not os.path.isdir(self.base_dir):
+            return []
+        versions = [
+            v
+            for v in os.listdir(self.base_dir)
+            if os.path.isfile(os.path.join(self.base_dir, v, "champion.json"))
+        ]
+        return sorted(versions, key=_version_key)
+
+    def _read(self, folder, filename):
+        path = os.path.join(folder, filename)
+        if not os.path.isfile(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def load(self, version=None):
+        versions = self.available_versions()
+        if not versions:
+            print(f"No static data bundle in {self.base_dir}, using built-in names")
+            return False
+        if version is None:
+            version = versions[-1]
+        folder = os.path.join(self.base_dir, version)
+
+        champions = {}
+        champions_by_name = {}
+        champions_by_key = {}
+        data = self._read(folder, "champion.json") or {}
+        for champ in data.get("data", {}).values():
+            champions_by_name[champ["id"]] = champ
+            champions_by_key[champion_key(champ["id"])] = champ
+            champions_by_key[champion_key(champ.get("name", ""))] = champ
+            try:
+                champions[int(champ["key"])] = champ
+            except (KeyError, ValueError):
+                pass
+
+        items = {}
+        data = self._read(folder, "item.json") or {}
+        for item_id, item in data.get("data", {}).items():
+            items[int(item_id)] = item
+
+        summoner_spells = {}
+        data = self._read(folder, "summoner.json") or {}
+        for spell in data.get("data", {}).values():
+            try:
+                summoner_spells[int(spell["key"])] = spell
+            except (KeyError, ValueError):
+                pass
+
+        runes = {}
+        for tree in self._read(folder, "runesReforged.json") or []:
+            runes[tree["id"]] = tree
+            for slot in tree.get("slots", []):
+                for rune in slot.get("runes", []):
+                    runes[rune["id"]] = rune
+
+        queues = {}
+        for q in self._read(folder, "queues.json") or []:
+            queues[q["queueId"]] = q
+
+        # Swap the indexes in together so readers on other threads never see a half load
+        self.champions = champions
+        self.champions_by_name = champions_by_name
+        self.champions_by_key = champions_by_key
+        self.items = items
+        self.summoner_spells = summoner_spells
+        self.runes = runes
+        self.queues = queues
+        self.version = version
+        print(f"Loaded static data {version} ({len(champions)} champions)")
+        return True
+
+    def refresh(self):
+        """Download the latest Data Dragon release into the local bundle and load it."""
+        response = requests.get(f"{DDRAGON_BASE}/api/versions.json", timeout=15)
+        response.raise_for_status()
+        latest = response.json()[0]
+        folder = os.path.join(self.base_dir, latest)
+        if latest not in self.available_versions():
+            tmp_folder = folder + ".tmp"
+            os.makedirs(tmp_folder, exist_ok=True)
+            for filename in self.BUNDLE_FILES:
+                if filename == "queues.json":
+                    url = QUEUES_URL
+                else:
+                    url = f"{DDRAGON_BASE}/cdn/{latest}/data/en_US/{filename}"
+                print("Fetching static data:", url)
+                r = requests.get(url, timeout=30)
+                r.raise_for_status()
+                with open(os.path.join(tmp_folder, filename), "wb") as f:
+                    f.write(r.content)
+            os.replace(tmp_folder, folder)
+        return self.load(latest)
+
+    def champion(self, champion):
+        """Look up a champion by numeric key or by id name."""
+        if isinstance(champion, int):
+            return self.champions.get(champion)
+        return self.champions_by_name.get(champion)
+
+    def find_champion(self, text):
+        """Look up a champion from user input, by id or display name in any case."""
+        return self.champions_by_key.get(champion_key(text))
+
+    def champion_display_name(self, champion):
+        champ = self.champion(champion)
+        if champ:
+            return champ.get("name", champ["id"])
+        return str(champion)
+
+    def queue_name(self, queue_id):
+        if queue_id in QUEUE_NAMES:
+            return QUEUE_NAMES[queue_id]
+        q = self.queues.get(queue_id)
+        if q and q.get("description"):
+            description = q["description"]
+            if description.endswith(" games"):
+                description = description[: -len(" games")]
+            return description
+        return f"Queue {queue_id}"
+
+    def champion_icon_path(self, champion_name):
+        if not self.version:
+            return None
+        return os.path.join(
+            self.base_dir, self.version, "img", "champion", f"{champion_name}.png"
+        )
+
+    def champion_icon_url(self, champion_name):
+        if not self.version:
+            return None
+        return f"{DDRAGON_BASE}/cdn/{self.version}/img/champion/{champion_name}.png"
+
+
+static_data = StaticData()
+
+
+class ChampionIconCache:
+    """Bounded LRU of decoded champion icons.
+
+    Files are read (and downloaded if missing) on a loader thread, only the
+    PhotoImage decode happens on the Tk thread since Tk objects can't be
+    created anywhere else.
+    """
+
+    def __init__(self, root, data, max_size=64, icon_size=16):
+        self.root = root
+        self.data = data
+        self.max_size = max_size
+        self.icon_size = icon_size
+        self._images = OrderedDict()
+        self._pending = {}
+        self._queue = queue.Queue()
+        self._loader = threading.Thread(target=self._load_loop, daemon=True)
+        self._loader.start()
+
+    def get(self, champion_name, callback):
+        """Call callback(image) once the icon is ready. Call from the Tk thread only."""
+        image = self._images.get(champion_name)
+        if image is not None:
+            self._images.move_to_end(champion_name)
+            callback(image)
+            return
+        if champion_name in self._pending:
+            self._pending[champion_name].append(callback)
+            return
+        self._pending[champion_name] = [callback]
+        self._queue.put(champion_name)
+
+    def _load_loop(self):
+        while True:
+            champion_name = self._queue.get()
+            raw = None
+            try:
+                raw = self._read_icon(champion_name)
+            except Exception as e:
+                print(f"Could not load icon for {champion_name}: {e}")
+            self.root.after(0, self._decode, champion_name, raw)
+
+    def _read_icon(self, champion_name):
+        path = self.data.champion_icon_path(champion_name)
+        if not path:
+            return None
+        if not os.path.isfile(path):
+            url = self.data.champion_icon_url(champion_name)
+            r = requests.get(url, timeout=10)
+            r.raise_for_status()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(r.content)
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _decode(self, champion_name, raw):
+        callbacks = self._pending.pop(champion_name, [])
+        if raw is None:
+            return
+        image = tk.PhotoImage(data=base64.b64encode(raw))
+        factor = max(1, image.width() // self.icon_size)
+        if factor > 1:
+            image = image.subsample(factor)
+        self._images[champion_name] = image
+        while len(self._images) > self.max_size:
+            self._images.popitem(last=False)
+        for callback in callbacks:
+            callback(image)
+
+
+MATCHES_DIR = os.path.join(DATA_DIR, "matches")
+
+
+class MatchStore:
+    """Match documents cached on disk, one json file per match id."""
+
+    def __init__(self, base_dir=MATCHES_DIR):
+        self.base_dir = base_dir
+
+    def path(self, match_id):
+        return os.path.join(self.base_dir, f"{match_id}.json")
+
+    def has(self, match_id):
+        return os.path.isfile(self.path(match_id))
+
+    def put_raw(self, match_id, raw):
+        """Store the API's response bytes as they are, no need to parse them here."""
+        os.makedirs(self.base_dir, exist_ok=True)
+        tmp_path = self.path(match_id) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(raw)
+        os.replace(tmp_path, self.path(match_id))
+        return match_id
+
+    def get_raw(self, match_id):
+        try:
+            with profiler.phase("disk"):
+                with open(self.path(match_id), "rb") as f:
+                    return f.read()
+        except OSError:
+            return None
+
+    def get(self, match_id):
+        try:
+            with profiler.phase("disk"):
+                with open(self.path(match_id), "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def ids(self):
+        if not os.path.isdir(self.base_dir):
+            return []
+        return sorted(
+            name[: -len(".json")]
+            for name in os.listdir(self.base_dir)
+            if name.endswith(".json")
+        )
+
+    def iter_matches(self, match_ids=None):
+        """Yield stored match documents one at a time."""
+        for match_id in match_ids if match_ids is not None else self.ids():
+            match_data = self.get(match_id)
+            if match_data is not None:
+                yield match_data
+
+
+match_store = MatchStore()
+
+INDEX_PATH = os.path.join(DATA_DIR, "index.jsonl")
+
+
+def champion_key(name):
+    """Normalise a champion name for lookups ("Kai'Sa", "kaisa" -> "kaisa")."""
+    return "".join(c for c in str(name).lower() if c.isalnum())
+
+
+def match_summary(match_data):
+    """Compact per-match record the secondary indexes are built from."""
+    info = match_data.get("info", {})
+    parts = []
+    for p in info.get("participants", []):
+        game_name = p.get("riotIdGameName")
+        riot_id = f"{game_name}#{p.get('riotIdTagline', '')}" if game_name else None
+        parts.append(
+            [
+                p.get("puuid"),
+                p.get("championName"),
+                p.get("teamId"),
+                1 if p.get("win") else 0,
+                riot_id,
+            ]
+        )
+    return {
+        "id": match_data.get("metadata", {}).get("matchId"),
+        "start": info.get("gameStartTimestamp") or info.get("gameCreation") or 0,
+        "queue": info.get("queueId", 0),
+        "parts": parts,
+    }
+
+
+class MatchIndex:
+    """Secondary indexes over the stored matches.
+
+    Each ingested match appends its summary to an append-only log, startup just
+    replays the log so no match document has to be opened to answer a query.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.matches = {}  # match id -> summary
+        self.by_champion = defaultdict(set)
+        self.by_player_champion = defaultdict(set)  # (puuid, champion key)
+        self.by_queue = defaultdict(set)
+        self.by_puuid = defaultdict(set)
+        self.by_outcome = defaultdict(set)  # (puuid, won)
+        self.by_start = []  # sorted (start, match id)
+        self.riot_ids = {}  # lowercased "name#tag" -> puuid
+        self.names = {}  # puuid -> last seen "name#tag"
+
+    def load(self):
+        if os.path.isfile(self.path):
+            with self._lock, open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._add(json.loads(line))
+                    except (ValueError, KeyError, TypeError):
+                        continue  # a torn last line from a crash
+        print(f"Indexed {len(self.matches)} matches")
+
+    def catch_up(self, store):
+        """Index matches stored before the index existed (or lost from the log).
+
+        Every stored file has to be decoded, so this runs off the Tk thread.
+        """
+        with self._lock:
+            missing = [store.path(m) for m in store.ids() if m not in self.matches]
+        if not missing:
+            return
+        for summary in analytics_pool.map_stream(summarize_match_file, missing):
+            if summary is not None:
+                _index_new_match(summary)
+        print(f"Indexed {len(missing)} more matches, {len(self.matches)} in all")
+
+    def add(self, summary):
+        with self._lock:
+            if not summary["id"] or summary["id"] in self.matches:
+                return False
+            self._add(summary)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(summary, separators=(",", ":")) + "\n")
+        return True
+
+    def _add(self, summary):
+        match_id = summary["id"]
+        if match_id in self.matches:
+            return
+        self.matches[match_id] = summary
+        self.by_queue[summary["queue"]].add(match_id)
+        for puuid, champion, team_id, won, riot_id in summary["parts"]:
+            key = champion_key(champion)
+            self.by_champion[key].add(match_id)
+            self.by_player_champion[(puuid, key)].add(match_id)
+            self.by_puuid[puuid].add(match_id)
+            self.by_outcome[(puuid, bool(won))].add(match_id)
+            if riot_id:
+                self.riot_ids[riot_id.lower()] = puuid
+                self.names[puuid] = riot_id
+        bisect.insort(self.by_start, (summary["start"], match_id))
+
+    def team_of(self, match_id, puuid):
+        for part in self.matches[match_id]["parts"]:
+            if part[0] == puuid:
+                return part[2]
+        return None
+
+    def query(
+        self,
+        puuid=None,
+        champion=None,
+        queue_id=None,
+        teammate=None,
+        win=None,
+        since=None,
+        until=None,
+    ):
+        """Match ids matching every given filter, newest first.
+
+        champion is the champion played by puuid when puuid is given, otherwise
+        by anyone. teammate only counts as one when on puuid's team. win needs
+        puuid. since/until are epoch milliseconds.
+        """
+        with self._lock:
+            candidates = []
+            if champion:
+                champ = static_data.find_champion(champion)
+                key = champion_key(champ["id"] if champ else champion)
+                if puuid:
+                    candidates.append(self.by_player_champion.get((puuid, key), set()))
+                else:
+                    candidates.append(self.by_champion.get(key, set()))
+            if queue_id is not None:
+                candidates.append(self.by_queue.get(queue_id, set()))
+            if puuid:
+                candidates.append(self.by_puuid.get(puuid, set()))
+            if teammate:
+                candidates.append(self.by_puuid.get(teammate, set()))
+            if win is not None and puuid:
+                candidates.append(self.by_outcome.get((puuid, win), set()))
+
+            lo = 0
+            hi = len(self.by_start)
+            if since is not None:
+                lo = bisect.bisect_left(self.by_start, (since, ""))
+            if until is not None:
+                hi = bisect.bisect_right(self.by_start, (until, "\uffff"))
+
+            if candidates:
+                candidates.sort(key=len)
+                result = set(candidates[0])
+                for other in candidates[1:]:
+                    result &= other
+                    if not result:
+                        break
+                if since is not None or until is not None:
+                    if hi - lo < len(result):
+                        result &= {m for _, m in self.by_start[lo:hi]}
+                    else:
+                        since_ms = since if since is not None else float("-inf")
+                        until_ms = until if until is not None else float("inf")
+                        result = {
+                            m
+                            for m in result
+                            if since_ms <= self.matches[m]["start"] <= until_ms
+                        }
+            else:
+                result = {m for _, m in self.by_start[lo:hi]}
+
+            if teammate and puuid:
+                result = {
+                    m
+                    for m in result
+                    if self.team_of(m, puuid) == self.team_of(m, teammate)
+                }
+            return sorted(result, key=lambda m: self.matches[m]["start"], reverse=True)
+
+    def queue_ids(self):
+        with self._lock:
+            return sorted(q for q, ids in self.by_queue.items() if ids)
+
+    def puuid_for_riot_id(self, riot_id):
+        return self.riot_ids.get(riot_id.strip().lower())
+
+
+match_index = MatchIndex()
+
+
+class CoOccurrenceGraph:
+    """Sparse teammate/opponent graph between players of the stored matches.
+
+    edges[a][b] packs four EDGE_BITS wide counters into one int: games
+    together, wins together, games against, a's wins against b. A one-off
+    opponent can't make anyone's top lists, so a player only gets a row once
+    the index has them in two matches, built then from the matches already
+    counted.
+    """
+
+    EDGE_BITS = 16
+    EDGE_MASK = (1 << EDGE_BITS) - 1
+
+    def __init__(self, index):
+        self.index = index
+        self._lock = threading.Lock()
+        self.edges = {}
+        self._counted = set()  # match ids, loading can overlap with new matches
+
+    def load(self, index):
+        self.index = index
+        with index._lock:
+            summaries = list(index.matches.values())
+        for summary in summaries:
+            self.add(summary)
+        print(f"Co-occurrence graph: {len(self.edges)} players")
+
+    def _count(self, row, puuid, summary):
+        parts = summary["parts"]
+        team_id, won = next((p[2], p[3]) for p in parts if p[0] == puuid)
+        for other, _, other_team, _, _ in parts:
+            if other == puuid or not other:
+                continue
+            if other_team == team_id:
+                delta = 1 | won << self.EDGE_BITS
+            else:
+                delta = (1 | won << self.EDGE_BITS) << 2 * self.EDGE_BITS
+            row[other] = row.get(other, 0) + delta
+
+    def _build_row(self, puuid):
+        with self.index._lock:
+            summaries = [
+                self.index.matches[m]
+                for m in self.index.by_puuid.get(puuid, ())
+                if m in self._counted
+            ]
+        row = {}
+        for summary in summaries:
+            self._count(row, puuid, summary)
+        return row
+
+    def add(self, summary):
+        puuids = [p[0] for p in summary["parts"] if p[0]]
+        with self.index._lock:
+            counts = {p: len(self.index.by_puuid.get(p, ())) for p in puuids}
+        with self._lock:
+            if summary["id"] in self._counted:
+                return
+            for puuid in puuids:
+                row = self.edges.get(puuid)
+                if row is None:
+                    if counts[puuid] < 2:
+                        continue
+                    row = self.edges[puuid] = self._build_row(puuid)
+                self._count(row, puuid, summary)
+            self._counted.add(summary["id"])
+
+    def _unpack(self, edge):
+        return [edge >> (i * self.EDGE_BITS) & self.EDGE_MASK for i in range(4)]
+
+    def top_partners(self, puuid, n=10, min_games=2):
+        """(puuid, games, wins) of the players most often on puuid's team."""
+        with self._lock:
+            row = [(o, self._unpack(e)) for o, e in self.edges.get(puuid, {}).items()]
+        top = heapq.nlargest(
+            n, (e for e in row if e[1][0] >= min_games), key=lambda e: e[1][0]
+        )
+        return [(other, edge[0], edge[1]) for other, edge in top]
+
+    def top_opponents(self, puuid, n=10, min_games=2):
+        """(puuid, games, puuid's wins) of the players most often against puuid."""
+        with self._lock:
+            row = [(o, self._unpack(e)) for o, e in self.edges.get(puuid, {}).items()]
+        top = heapq.nlargest(
+            n, (e for e in row if e[1][2] >= min_games), key=lambda e: e[1][2]
+        )
+        return [(other, edge[2], edge[3]) for other, edge in top]
+
+
+co_graph = CoOccurrenceGraph(match_index)
+
+
+def _index_new_match(summary):
+    if match_index.add(summary):
+        co_graph.add(summary)
+
+
+# --- Process pool for CPU heavy analysis ---
+
+# Participant fields the views use, the rest of a match document never leaves the pool
+TRIMMED_PARTICIPANT_FIELDS = [
+    "puuid",
+    "riotIdGameName",
+    "riotIdTagline",
+    "teamId",
+    "teamPosition",
+    "championId",
+    "championName",
+    "win",
+    "kills",
+    "deaths",
+    "assists",
+    "totalMinionsKilled",
+    "neutralMinionsKilled",
+    "goldEarned",
+    "visionScore",
+    "totalDamageDealtToChampions",
+]
+
+
+def trim_match(match_data):
+    """Same shape as a match document, with only the fields the views read."""
+    metadata = match_data.get("metadata", {})
+    info = match_data.get("info", {})
+    return {
+        "metadata": {
+            "matchId": metadata.get("matchId"),
+            "participants": metadata.get("participants", []),
+        },
+        "info": {
+            "platformId": info.get("platformId"),
+            "queueId": info.get("queueId", 0),
+            "gameStartTimestamp": info.get("gameStartTimestamp"),
+            "gameDuration": info.get("gameDuration", 0),
+            "participants": [
+                {f: p[f] for f in TRIMMED_PARTICIPANT_FIELDS if f in p}
+                for p in info.get("participants", [])
+            ],
+        },
+    }
+
+
+def decode_match(raw):
+    """Pool worker: raw match json -> (trimmed match, index summary)."""
+    match_data = json.loads(raw)
+    return trim_match(match_data), match_summary(match_data)
+
+
+def summarize_match_file(path):
+    """Pool worker: index summary of a stored match file."""
+    try:
+        with open(path, "rb") as f:
+            return decode_match(f.read())[1]
+    except (OSError, ValueError):
+        return None
+
+
+def benchmark_rows_file(path):
+    """Pool worker: (match id, benchmark_rows) of a stored match file."""
+    try:
+        with open(path, "rb") as f:
+            match_data = json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    return match_data.get("metadata", {}).get("matchId"), benchmark_rows(match_data)
+
+
+def _warm_up():
+    return os.getpid()
+
+
+class AnalyticsPool:
+    """Long lived worker processes for CPU bound analysis.
+
+    Work running in threads holds the GIL and stalls the Tk mainloop, so
+    decoding and aggregation go here and only compact results come back. The
+    processes are started once and reused. If the pool can't run (frozen
+    build without multiprocessing support, a crashed worker) the work runs in
+    the calling thread instead.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or min(4, max(1, (os.cpu_count() or 2) - 1))
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn, forking a process with Tk and worker threads isn't safe
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _reset(self, error):
+        print(f"Analytics pool unavailable, running in process: {error}")
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def warm(self):
+        """Start the worker processes ahead of the first real job."""
+
+        def _warm():
+            try:
+                executor = self._get_executor()
+                for future in [
+                    executor.submit(_warm_up) for _ in range(self.max_workers)
+                ]:
+                    future.result()
+            except Exception as e:
+                self._reset(e)
+
+        threading.Thread(target=_warm, daemon=True).start()
+
+    def run(self, fn, *args):
+        """fn(*args) in a worker process, blocking the calling (non Tk) thread."""
+        with profiler.phase("pool"):
+            try:
+                return self._get_executor().submit(fn, *args).result()
+            except (concurrent.futures.process.BrokenProcessPool, OSError) as e:
+                self._reset(e)
+        return fn(*args)
+
+    def map_stream(self, fn, items, window=None):
+        """Yield fn(item) for each item as results complete (not in input order).
+
+        Only a window of items is in flight at once, so a long input doesn't
+        queue everything up front.
+        """
+        items = iter(items)
+        window = window or self.max_workers * 4
+        pending = {}  # future -> item
+        try:
+            executor = self._get_executor()
+            for item in items:
+                pending[executor.submit(fn, item)] = item
+                while len(pending) >= window:
+                    yield from self._collect(pending)
+            while pending:
+                yield from self._collect(pending)
+        except (concurrent.futures.process.BrokenProcessPool, OSError) as e:
+            # Results already yielded are kept, whatever is left runs here
+            self._reset(e)
+            for item in itertools.chain(list(pending.values()), items):
+                yield fn(item)
+
+    def _collect(self, pending):
+        done, _ = concurrent.futures.wait(
+            pending, return_when=concurrent.futures.FIRST_COMPLETED
+        )
+        for future in done:
+            result = future.result()
+            del pending[future]
+            yield result
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+analytics_pool = AnalyticsPool()
+
+
+def ingest_raw(raw):
+    """Decode a raw match document in the pool and keep it. Returns the trimmed match."""
+    trimmed, summary = analytics_pool.run(decode_match, raw)
+    match_id = summary["id"]
+    if match_id and not match_store.has(match_id):
+        match_store.put_raw(match_id, raw)
+        _index_new_match(summary)
+    return trimmed
+
+
+def load_match(match_id, match_base, timeout=15, priority=PRIORITY_INTERACTIVE):
+    """Trimmed match document from the local store, or the API when it isn't stored."""
+    raw = match_store.get_raw(match_id)
+    if raw is not None:
+        return analytics_pool.run(decode_match, raw)[0]
+    # Finished matches never change, so a stored copy never needs refetching
+    response = riot_get(
+        f"{match_base}{match_id}?api_key={api_key}", timeout=timeout, priority=priority
+    )
+    response.raise_for_status()
+    return ingest_raw(response.content)
+
+
+RANK_HISTORY_DIR = os.path.join(DATA_DIR, "rank_history")
+
+RANK_TIERS = [
+    "IRON",
+    "BRONZE",
+    "SILVER",
+    "GOLD",
+    "PLATINUM",
+    "EMERALD",
+    "DIAMOND",
+    "MASTER",
+    "GRANDMASTER",
+    "CHALLENGER",
+]
+RANK_DIVISIONS = ["IV", "III", "II", "I"]
+
+
+def _write_varint(out, n):
+    n = (n << 1) ^ (n >> 63)  # zigzag, small negative deltas stay small
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(data, pos):
+    n = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return (n >> 1) ^ -(n & 1), pos
+
+
+def ladder_score(sample):
+    """Single LP number for a (time, tier, division, lp, wins, losses) sample.
+
+    Master and above share one LP ladder, below that each division is 100 LP.
+    """
+    _, tier, division, lp, _, _ = sample
+    master = RANK_TIERS.index("MASTER")
+    if tier >= master:
+        return master * 400 + lp
+    return tier * 400 + division * 100 + lp
+
+
+class RankHistory:
+    """Per player, per queue rank samples, delta encoded on disk.
+
+    Each series is a .bin file of records (a type byte then zigzag varints of
+    time, tier, division, LP, wins, losses). Every KEYFRAME_EVERY records one
+    is stored with absolute values and its time and offset go in the .idx
+    file, so a range query only decodes from the nearest keyframe onwards.
+    A sample identical to the last one isn't stored.
+    """
+
+    KEYFRAME_EVERY = 64
+    _DELTA = 0
+    _KEYFRAME = 1
+    _IDX = struct.Struct("<qQ")
+
+    def __init__(self, base_dir=RANK_HISTORY_DIR):
+        self.base_dir = base_dir
+        self._lock = threading.Lock()
+        self._tails = {}  # series -> (last sample, records since keyframe)
+
+    def _paths(self, puuid, queue_type):
+        base = os.path.join(self.base_dir, f"{puuid}_{queue_type}")
+        return base + ".bin", base + ".idx"
+
+    def _keyframes(self, idx_path):
+        try:
+            with open(idx_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return []
+        return [
+            self._IDX.unpack_from(data, i)
+            for i in range(0, len(data) - len(data) % self._IDX.size, self._IDX.size)
+        ]
+
+    def _decode(self, bin_path, offset, until=None):
+        """Yield (sample, records since keyframe) from a keyframe offset onwards."""
+        try:
+            with open(bin_path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except OSError:
+            return
+        pos = 0
+        sample = None
+        since_keyframe = 0
+        while pos < len(data):
+            try:
+                kind = data[pos]
+                values = []
+                pos += 1
+                for _ in range(6):
+                    value, pos = _read_varint(data, pos)
+                    values.append(value)
+            except IndexError:
+                return  # torn write at the end
+            if kind == self._KEYFRAME:
+                sample = tuple(values)
+                since_keyframe = 0
+            elif sample is not None:
+                sample = tuple(a + b for a, b in zip(sample, values))
+                since_keyframe += 1
+            else:
+                return
+            if until is not None and sample[0] > until:
+                return
+            yield sample, since_keyframe
+
+    def _tail(self, puuid, queue_type):
+        key = (puuid, queue_type)
+        if key not in self._tails:
+            bin_path, idx_path = self._paths(puuid, queue_type)
+            keyframes = self._keyframes(idx_path)
+            tail = (None, 0)
+            if keyframes:
+                for tail in self._decode(bin_path, keyframes[-1][1]):
+                    pass
+            self._tails[key] = tail
+        return self._tails[key]
+
+    def record(self, puuid, queue_type, tier, division, lp, wins, losses, ts=None):
+        if tier not in RANK_TIERS:
+            return False
+        sample = (
+            int(ts if ts is not None else time.time()),
+            RANK_TIERS.index(tier),
+            RANK_DIVISIONS.index(division) if division in RANK_DIVISIONS else 3,
+            lp,
+            wins,
+            losses,
+        )
+        with self._lock:
+            last, since_keyframe = self._tail(puuid, queue_type)
+            if last is not None and last[1:] == sample[1:]:
+                return False
+            bin_path, idx_path = self._paths(puuid, queue_type)
+            os.makedirs(self.base_dir, exist_ok=True)
+            out = bytearray()
+            keyframe = last is None or since_keyframe + 1 >= self.KEYFRAME_EVERY
+            if keyframe:
+                out.append(self._KEYFRAME)
+                values = sample
+            else:
+                out.append(self._DELTA)
+                values = [a - b for a, b in zip(sample, last)]
+            for value in values:
+                _write_varint(out, value)
+            with open(bin_path, "ab") as f:
+                offset = f.tell()
+                f.write(out)
+            if keyframe:
+                with open(idx_path, "ab") as f:
+                    f.write(self._IDX.pack(sample[0], offset))
+            self._tails[(puuid, queue_type)] = (
+                sample, 0 if keyframe else since_keyframe + 1
+            )
+        return True
+
+    def record_entries(self, puuid, entries):
+        """Record every queue of a league-v4 entries response."""
+        if not puuid or not isinstance(entries, list):
+            return
+        for entry in entries:
+            if entry.get("queueType") and entry.get("tier"):
+                self.record(
+                    puuid,
+                    entry["queueType"],
+                    entry["tier"],
+                    entry.get("rank", ""),
+                    entry.get("leaguePoints", 0),
+                    entry.get("wins", 0),
+                    entry.get("losses", 0),
+                )
+
+    def latest(self, puuid, queue_type):
+        """The newest sample of a series, or None."""
+        if not os.path.isfile(self._paths(puuid, queue_type)[1]):
+            return None  # don't keep a cache entry for every player ever seen
+        with self._lock:
+            return self._tail(puuid, queue_type)[0]
+
+    def range(self, puuid, queue_type, since=None, until=None):
+        """Samples with since <= time <= until, plus the one in effect at since."""
+        bin_path, idx_path = self._paths(puuid, queue_type)
+        with self._lock:
+            keyframes = self._keyframes(idx_path)
+            if not keyframes:
+                return []
+            start = 0
+            if since is not None:
+                i = bisect.bisect_right([ts for ts, _ in keyframes], since) - 1
+                start = keyframes[max(i, 0)][1]
+            samples = []
+            previous = None
+            for sample, _ in self._decode(bin_path, start, until):
+                if since is not None and sample[0] < since:
+                    previous = sample
+                    continue
+                samples.append(sample)
+        if previous is not None:
+            samples.insert(0, previous)
+        return samples
+
+
+rank_history = RankHistory()
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+def rank_sparkline(puuid, queue_type="RANKED_SOLO_5x5", days=30, width=30):
+    """LP trend over the last days as a line of block characters, or None."""
+    now = time.time()
+    since = now - days * 86400
+    samples = rank_history.range(puuid, queue_type, since=since)
+    if not samples:
+        return None
+    # One bucket per step, each showing the last sample in effect at its end
+    step = (now - since) / width
+    points = []
+    i = 0
+    current = None
+    for bucket in range(1, width + 1):
+        bucket_end = since + bucket * step
+        while i < len(samples) and samples[i][0] <= bucket_end:
+            current = ladder_score(samples[i])
+            i += 1
+        if current is not None:
+            points.append(current)
+    low, high = min(points), max(points)
+    span = high - low or 1
+    line = "".join(
+        SPARK_CHARS[int((p - low) / span * (len(SPARK_CHARS) - 1))] for p in points
+    )
+    change = points[-1] - points[0]
+    return f"{line} ({change:+d} LP)"
+
+
+BENCHMARKS_PATH = os.path.join(DATA_DIR, "benchmarks.json")
+
+# (key, label) of the per minute stats games are compared on
+BENCHMARK_METRICS = [
+    ("kda", "KDA"),
+    ("cs", "CS/min"),
+    ("gold", "Gold/min"),
+    ("vision", "Vision/min"),
+    ("damage", "Damage/min"),
+]
+
+
+def benchmark_rows(match_data):
+    """(puuid, championName, role, {metric: value}) per player of a match."""
+    info = match_data.get("info", {})
+    duration = info.get("gameDuration", 0)
+    if duration > 20000:
+        duration /= 1000  # very old matches give milliseconds
+    if duration < 300:
+        return []  # remakes say nothing about anyone
+    minutes = duration / 60
+    rows = []
+    for p in info.get("participants", []):
+        if not p.get("championName"):
+            continue
+        cs = p.get("totalMinionsKilled", 0) + p.get("neutralMinionsKilled", 0)
+        metrics = {
+            "kda": (p.get("kills", 0) + p.get("assists", 0))
+            / max(p.get("deaths", 0), 1),
+            "cs": cs / minutes,
+            "gold": p.get("goldEarned", 0) / minutes,
+            "vision": p.get("visionScore", 0) / minutes,
+            "damage": p.get("totalDamageDealtToChampions", 0) / minutes,
+        }
+        rows.append((p.get("puuid"), p["championName"], p.get("teamPosition"), metrics))
+    return rows
+
+
+class QuantileSketch:
+    """KLL quantile sketch, approximate ranks in bounded memory.
+
+    Values go into a stack of compactors. When one overflows it is sorted and
+    every other value (from a random start) moves up a level, where each value
+    stands for twice as many. Higher levels get geometrically smaller
+    capacities, so at k=200 it holds about 600 values however many are added
+    and ranks are off by well under 2%. Pass rng (a random.Random) to make
+    the compactions repeatable.
+    """
+
+    C = 2 / 3
+
+    def __init__(self, k=200, rng=None):
+        self.k = k
+        self._rng = rng or random.Random()
+        self.n = 0
+        self.levels = [[]]
+        self._size = 0
+        self._max_size = self._capacity(0)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(self.k * self.C**depth), 2)
+
+    def add(self, value):
+        self.levels[0].append(value)
+        self.n += 1
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def _compress(self):
+        for h, level in enumerate(self.levels):
+            if len(level) >= self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append([])
+                    self._max_size = sum(
+                        self._capacity(i) for i in range(len(self.levels))
+                    )
+                level.sort()
+                promoted = level[self._rng.randint(0, 1) :: 2]
+                self.levels[h + 1].extend(promoted)
+                self._size -= len(level) - len(promoted)
+                level.clear()
+                return  # one compaction frees enough room
+
+    def rank(self, value):
+        """Fraction of added values <= value."""
+        if not self.n:
+            return 0.0
+        below = 0
+        for h, level in enumerate(self.levels):
+            below += sum(1 for v in level if v <= value) << h
+        return min(below / self.n, 1.0)
+
+    def to_json(self):
+        # Values stay exact, a rounded one at level h would shift ranks by 2^h/n
+        return {"k": self.k, "n": self.n, "levels": [list(v) for v in self.levels]}
+
+    @classmethod
+    def from_json(cls, data, rng=None):
+        sketch = cls(data["k"], rng)
+        sketch.n = data["n"]
+        sketch.levels = data["levels"] or [[]]
+        sketch._size = sum(len(level) for level in sketch.levels)
+        sketch._max_size = sum(sketch._capacity(h) for h in range(len(sketch.levels)))
+        return sketch
+
+
+def player_tier(puuid):
+    """Solo queue tier from the cached rank or the rank history, or None."""
+    rank_info = player_cache.cached_rank(puuid)
+    if rank_info and rank_info.get("tier"):
+        return rank_info["tier"].upper()
+    sample = rank_history.latest(puuid, "RANKED_SOLO_5x5")
+    return RANK_TIERS[sample[1]] if sample else None
+
+
+class MatchBenchmarks:
+    """Percentiles of a player's stats against every stored game.
+
+    One QuantileSketch per metric for each champion, champion and role,
+    champion and tier and champion, role and tier, so a lookup never scans
+    matches. Tier is the player's solo queue tier. It is rarely known when a
+    match is stored, so a player's rows wait in a bounded queue until their
+    rank is looked up (set_tier) and only then count towards the tier groups.
+    The queue is saved with the sketches, so a restart doesn't lose them.
+
+    The sketches follow the index log on their own thread: every few seconds
+    the lines added since the saved offset are read, their matches decoded in
+    the pool and added, so storing a match never waits on this. The offset is
+    saved with the sketches, a restart carries on from the last save.
+    """
+
+    ALL = "ALL"
+    MIN_GAMES = 20  # below this a percentile isn't worth showing
+    FOLLOW_INTERVAL = 5
+    SAVE_INTERVAL = 60
+    BATCH = 500  # index log lines per round
+    MAX_UNTIERED = 5000  # players whose rows wait for a tier
+    MAX_WAITING_ROWS = 10  # newest games kept per waiting player
+
+    def __init__(self, path=BENCHMARKS_PATH, index_path=INDEX_PATH):
+        self.path = path
+        self.index_path = index_path
+        self.store = None
+        self.sketches = {}  # "champion|role|tier" -> {metric: QuantileSketch}
+        self.offset = 0  # bytes of the index log included in the sketches
+        self._untiered = OrderedDict()  # puuid -> [(champion, role, metrics)]
+        self._lock = threading.Lock()
+        self._saved_at = time.time()
+        self._dirty = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def load(self, store):
+        """Read the saved sketches and add what the index log has gained since.
+
+        With no saved file that's every indexed match, each one decoded in
+        the pool, so this runs off the Tk thread.
+        """
+        self.store = store
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                sketches = {
+                    key: {m: QuantileSketch.from_json(s) for m, s in metrics.items()}
+                    for key, metrics in data["sketches"].items()
+                }
+                offset = int(data["offset"])
+                log_size = (
+                    os.path.getsize(self.index_path)
+                    if os.path.isfile(self.index_path)
+                    else 0
+                )
+                if offset > log_size:
+                    raise ValueError("index log is shorter than the saved offset")
+                untiered = OrderedDict(
+                    (puuid, [tuple(row) for row in rows])
+                    for puuid, rows in data["untiered"]
+                )
+                with self._lock:
+                    self.sketches = sketches
+                    self.offset = offset
+                    self._untiered = untiered
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Benchmarks unreadable, rebuilding: {e}")
+        added = 0
+        while True:
+            count = self.catch_up()
+            if not count:
+                break
+            added += count
+        if added:
+            print(f"Benchmarks: added {added} matches")
+            self.save()
+
+    def catch_up(self):
+        """Add up to BATCH matches from the index log, returns how many lines."""
+        try:
+            with open(self.index_path, "rb") as f:
+                f.seek(self.offset)
+                lines = []
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # still being written, next round
+                    lines.append(line)
+                    if len(lines) >= self.BATCH:
+                        break
+        except OSError:
+            return 0
+        paths = []
+        for line in lines:
+            try:
+                paths.append(self.store.path(json.loads(line)["id"]))
+            except (ValueError, KeyError, TypeError):
+                continue  # the index skips these too
+        results = [
+            r
+            for r in analytics_pool.map_stream(benchmark_rows_file, paths)
+            if r is not None
+        ]
+        tiers = {
+            puuid: player_tier(puuid) for _, rows in results for puuid, *_ in rows
+        }
+        # Rows and offset change together, so a save never has one without the other
+        with self._lock:
+            for _, rows in results:
+                self._add_rows(rows, tiers)
+            self.offset += sum(len(line) for line in lines)
+            if lines:
+                self._dirty = True
+        return len(lines)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.FOLLOW_INTERVAL):
+            try:
+                while self.catch_up() and not self._stop.is_set():
+                    pass
+                if self._dirty and time.time() - self._saved_at > self.SAVE_INTERVAL:
+                    self.save()
+            except Exception as e:
+                print(f"Benchmarks update failed: {e}")
+
+    def save(self):
+        # Only the copy is taken under the lock, encoding and writing happen after
+        with self._lock:
+            snapshot = {
+                "offset": self.offset,
+                # Oldest first, so the eviction order survives a restart
+                "untiered": [
+                    [puuid, list(rows)] for puuid, rows in self._untiered.items()
+                ],
+                "sketches": {
+                    key: {m: s.to_json() for m, s in metrics.items()}
+                    for key, metrics in self.sketches.items()
+                },
+            }
+            self._dirty = False
+            self._saved_at = time.time()
+        data = json.dumps(snapshot, separators=(",", ":"))
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def save_if_dirty(self):
+        if self._dirty:
+            self.save()
+
+    def _keys(self, champion, role, tier):
+        keys = [f"{champion}|{self.ALL}|{self.ALL}"]
+        if role:
+            keys.append(f"{champion}|{role}|{self.ALL}")
+        if tier:
+            keys.extend(self._tier_keys(champion, role, tier))
+        return keys
+
+    def _tier_keys(self, champion, role, tier):
+        keys = [f"{champion}|{self.ALL}|{tier}"]
+        if role:
+            keys.append(f"{champion}|{role}|{tier}")
+        return keys
+
+    def _add(self, keys, metrics):
+        for key in keys:
+            sketches = self.sketches.setdefault(key, {})
+            for metric, value in metrics.items():
+                if metric not in sketches:
+                    sketches[metric] = QuantileSketch()
+                sketches[metric].add(value)
+
+    def _add_rows(self, rows, tiers):
+        for puuid, champion, role, metrics in rows:
+            tier = tiers.get(puuid)
+            self._add(self._keys(champion, role, tier), metrics)
+            if tier is None and puuid:
+                waiting = self._untiered.setdefault(puuid, [])
+                waiting.append((champion, role, metrics))
+                del waiting[: -self.MAX_WAITING_ROWS]
+                self._untiered.move_to_end(puuid)
+        while len(self._untiered) > self.MAX_UNTIERED:
+            self._untiered.popitem(last=False)
+
+    def set_tier(self, puuid, tier):
+        """Count the player's games that were waiting for a tier."""
+        if not tier:
+            return
+        with self._lock:
+            rows = self._untiered.pop(puuid, [])
+            for champion, role, metrics in rows:
+                self._add(self._tier_keys(champion, role, tier.upper()), metrics)
+            if rows:
+                self._dirty = True
+
+    def percentile(self, champion, role, tier, metric, value):
+        """(percentile 0-100, (role, tier) compared against, games) or None.
+
+        Uses the most specific group with at least MIN_GAMES games.
+        """
+        for key_role, key_tier in [
+            (role, tier),
+            (self.ALL, tier),
+            (role, self.ALL),
+            (self.ALL, self.ALL),
+        ]:
+            if not key_role or not key_tier:
+                continue
+            with self._lock:
+                sketch = self.sketches.get(f"{champion}|{key_role}|{key_tier}", {})
+                sketch = sketch.get(metric)
+                if sketch and sketch.n >= self.MIN_GAMES:
+                    pct = round(sketch.rank(value) * 100)
+                    return pct, (key_role, key_tier), sketch.n
+        return None
+
+    def lines(self, match_data, puuid, tier=None):
+        """'CS/min 7.2 is p82 for Ahri MIDDLE at GOLD (140 games)' lines for one player."""
+        row = next((r for r in benchmark_rows(match_data) if r[0] == puuid), None)
+        if row is None:
+            return []
+        _, champion, role, metrics = row
+        tier = (tier or player_tier(puuid) or self.ALL).upper()
+        display = static_data.champion_display_name(champion)
+        out = []
+        for metric, label in BENCHMARK_METRICS:
+            result = self.percentile(champion, role, tier, metric, metrics[metric])
+            if result is None:
+                continue
+            pct, (key_role, key_tier), games = result
+            scope = display
+            if key_role != self.ALL:
+                scope += f" {key_role.title()}"
+            if key_tier != self.ALL:
+                scope += f" at {key_tier.title()}"
+            out.append(
+                f"{label} {metrics[metric]:.1f} is p{pct} for {scope} ({games} games)"
+            )
+        return out
+
+
+benchmarks = MatchBenchmarks()
+
+
+def record_rank(puuid, entries):
+    """Keep a fetched league-v4 entries response for the history and benchmarks."""
+    rank_history.record_entries(puuid, entries)
+    benchmarks.set_tier(puuid, parse_rank_entries(entries).get("tier"))
+
+
+SESSION_PATH = os.path.join(DATA_DIR, "session.json")
+
+
+def load_session(path=SESSION_PATH):
+    """Last session's user, rank and match list, or None."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            session = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(session, dict) or session.get("region") not in REGION_DATA:
+        return None
+    for key in ["puuid", "username", "tagline"]:
+        if not isinstance(session.get(key), str) or not session[key]:
+            return None
+    if not isinstance(session.get("saved_at"), (int, float)):
+        return None
+    if not isinstance(session.get("matches") or [], list):
+        return None
+    return session
+
+
+def save_session(
+    region, riot_name, riot_tag, puuid, rank, matches, path=SESSION_PATH
+):
+    session = {
+        "region": region,
+        "username": riot_name,
+        "tagline": riot_tag,
+        "puuid": puuid,
+        "rank": rank,
+        "matches": matches,
+        "saved_at": int(time.time()),
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(session, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    return session
+
+
+def clear_session(path=SESSION_PATH):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+WATCHLIST_PATH = os.path.join(DATA_DIR, "watchlist.json")
+
+
+class MatchWatcher:
+    """Polls tracked players for new matches on one background thread.
+
+    Each poll asks for the newest match id only. A player's interval grows while
+    nothing changes and resets when a game shows up, so idle players cost a
+    couple of requests an hour. All calls go through the shared rate budget.
+    """
+
+    ACTIVE_INTERVAL = 120  # seconds between polls right after a player's game
+    MAX_INTERVAL = 30 * 60
+    BACKOFF = 1.5
+    GAME_GAP = 15 * 60  # no point checking sooner than a game can take
+
+    def __init__(self, path=WATCHLIST_PATH):
+        self.path = path
+        self.players = {}  # puuid -> {"name", "region", "last_match", "interval"}
+        self._schedule = []  # heap of (next poll, puuid)
+        self._due = {}  # puuid -> its live heap entry's time, older entries are stale
+        self._subscribers = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._generation = 0  # bumped by start, an older poll thread then exits
+
+    def load(self):
+        if not os.path.isfile(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            players = json.load(f)
+        now = time.time()
+        with self._cond:
+            for i, (puuid, player) in enumerate(players.items()):
+                self.players[puuid] = player
+                # Spread the first round out instead of polling everyone at once
+                self._push(puuid, now + i * 0.5)
+
+    def _push(self, puuid, due):
+        self._due[puuid] = due
+        heapq.heappush(self._schedule, (due, puuid))
+        self._cond.notify()
+
+    def save(self):
+        with self._cond:
+            data = json.dumps(self.players, indent=1)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def track(self, puuid, region_name, name=None, last_match=None):
+        with self._cond:
+            if puuid not in self.players:
+                self.players[puuid] = {
+                    "name": name or puuid,
+                    "region": region_name,
+                    "last_match": last_match,
+                    "interval": self.ACTIVE_INTERVAL,
+                }
+                self._push(puuid, time.time())
+        self.save()
+
+    def untrack(self, puuid):
+        with self._cond:
+            self.players.pop(puuid, None)
+            self._due.pop(puuid, None)  # its heap entry is skipped when popped
+        self.save()
+
+    def is_tracked(self, puuid):
+        return puuid in self.players
+
+    def subscribe(self, callback):
+        """callback(puuid, name, new match ids newest first), run on the watcher thread."""
+        self._subscribers.append(callback)
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            # A thread from before the last stop may still be mid poll, this
+            # tells it to finish that poll and exit instead of carrying on
+            self._generation += 1
+            self._thread = threading.Thread(
+                target=self._run, args=(self._generation,), daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    @property
+    def running(self):
+        return self._running
+
+    def _current(self, generation):
+        return self._running and self._generation == generation
+
+    def _run(self, generation):
+        while True:
+            with self._cond:
+                while self._current(generation):
+                    if self._schedule:
+                        due, puuid = self._schedule[0]
+                        if self._due.get(puuid) != due:
+                            heapq.heappop(self._schedule)
+                            continue
+                        wait = due - time.time()
+                        if wait <= 0:
+                            heapq.heappop(self._schedule)
+                            break
+                    else:
+                        wait = None
+                    self._cond.wait(wait)
+                if not self._current(generation):
+                    return
+
+            try:
+                delay = self.poll(puuid)
+            except Exception as e:
+                print(f"Watch poll failed for {puuid}: {e}")
+                delay = self.MAX_INTERVAL
+            with self._cond:
+                if puuid in self.players:
+                    self._push(puuid, time.time() + delay)
+
+    def poll(self, puuid):
+        """Check one player, returns the delay until its next poll."""
+        player = self.players[puuid]
+        match_base = get_match_api_url(player["region"])
+        response = riot_get(
+            f"{match_base}by-puuid/{puuid}/ids?start=0&count=1&api_key={api_key}",
+            priority=PRIORITY_BACKGROUND,
+        )
+        response.raise_for_status()
+        newest = response.json()
+
+        if not newest or newest[0] == player["last_match"]:
+            player["interval"] = min(
+                player["interval"] * self.BACKOFF, self.MAX_INTERVAL
+            )
+            return player["interval"]
+
+        new_ids = [newest[0]]
+        if player["last_match"] is None:
+            new_ids = []  # first poll only sets the baseline
+        else:
+            # Only now pay for the longer list, to catch games played between polls
+            response = riot_get(
+                f"{match_base}by-puuid/{puuid}/ids?start=0&count=20&api_key={api_key}",
+                priority=PRIORITY_BACKGROUND,
+            )
+            if response.status_code == 200:
+                ids = response.json()
+                if player["last_match"] in ids:
+                    ids = ids[: ids.index(player["last_match"])]
+                new_ids = ids or new_ids
+
+        player["last_match"] = newest[0]
+        player["interval"] = self.ACTIVE_INTERVAL
+        self.save()
+
+        for match_id in new_ids:
+            if match_store.has(match_id):
+                continue
+            r = riot_get(
+                f"{match_base}{match_id}?api_key={api_key}",
+                timeout=20,
+                priority=PRIORITY_BACKGROUND,
+            )
+            if r.status_code == 200:
+                ingest_raw(r.content)
+        if new_ids:
+            for callback in list(self._subscribers):
+                try:
+                    callback(puuid, player["name"], new_ids)
+                except Exception as e:
+                    print(f"Watch subscriber failed: {e}")
+            return self.GAME_GAP
+        return player["interval"]
+
+
+match_watcher = MatchWatcher()
+
+
+def fetch_active_game(region_name, puuid, priority=PRIORITY_INTERACTIVE):
+    """The player's current game from the spectator endpoint, None if not in one."""
+    response = riot_get(
+        f"{get_spectator_api_url(region_name)}active-games/by-summoner/{puuid}"
+        f"?api_key={api_key}",
+        priority=priority,
+    )
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+
+class LiveGameFollower:
+    """Follows one player's live game on a background thread.
+
+    While the player isn't in a game the spectator check backs off up to
+    IDLE_MAX. During a game it sleeps until close to the usual game length
+    and only then checks every END_POLL seconds. Once the game is gone from
+    the spectator endpoint the finished match is fetched from match-v5 (it
+    can take a little while to show up there) and ingested. Every call is
+    background priority, so following a player never gets in the way of
+    what the user is clicking on.
+    """
+
+    IDLE_MIN = 60
+    IDLE_MAX = 10 * 60
+    BACKOFF = 1.5
+    EXPECTED_LENGTH = 25 * 60  # most games are over after this
+    END_POLL = 20
+    MATCH_RETRY = 10  # seconds between match-v5 attempts after the game ends
+    MATCH_ATTEMPTS = 30
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._target = None  # (puuid, region)
+        self._thread = None
+        self._on_game = None
+        self._on_finished = None
+
+    def follow(self, puuid, region_name, game=None, on_game=None, on_finished=None):
+        """Start following a player, replacing whoever was followed before.
+
+        on_game(game or None) is called when the player's game changes,
+        on_finished(match_id) once its match is stored. Both run on the
+        follower thread. game is the already fetched current game, if any.
+        """
+        with self._cond:
+            self._target = (puuid, region_name)
+            self._on_game = on_game
+            self._on_finished = on_finished
+            self._thread = threading.Thread(
+                target=self._run, args=(self._target, game), daemon=True
+            )
+            self._thread.start()
+            self._cond.notify_all()  # wakes the previous thread so it exits
+
+    def stop(self):
+        with self._cond:
+            self._target = None
+            self._cond.notify_all()
+
+    def following(self):
+        return self._target
+
+    def _sleep(self, target, seconds):
+        """Wait, returns False when the follower was stopped or retargeted."""
+        deadline = time.time() + seconds
+        with self._cond:
+            while self._target is target:
+                wait = deadline - time.time()
+                if wait <= 0:
+                    return True
+                self._cond.wait(wait)
+        return False
+
+    def _notify(self, target, callback, *args):
+        if callback is None or self._target is not target:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"Live game callback failed: {e}")
+
+    def next_poll(self, game, now=None):
+        """Seconds until the spectator endpoint is worth asking again."""
+        now = now or time.time()
+        start = game.get("gameStartTime") or 0
+        if start:
+            elapsed = now - start / 1000
+        else:
+            elapsed = game.get("gameLength", 0)  # still loading, start is 0
+        return max(self.EXPECTED_LENGTH - elapsed, self.END_POLL)
+
+    def _run(self, target, game):
+        puuid, region_name = target
+        on_game = self._on_game
+        on_finished = self._on_finished
+        idle = self.IDLE_MIN
+        current = game
+        # The caller has just checked, so don't ask again straight away
+        delay = self.next_poll(game) if game else self.IDLE_MIN
+        while self._sleep(target, delay):
+            try:
+                game = fetch_active_game(region_name, puuid, PRIORITY_BACKGROUND)
+            except Exception as e:
+                print(f"Live game check failed: {e}")
+                delay = self.IDLE_MAX
+                continue
+            if game is not None:
+                if current is None or game.get("gameId") != current.get("gameId"):
+                    self._notify(target, on_game, game)
+                current = game
+                idle = self.IDLE_MIN
+                delay = self.next_poll(game)
+                continue
+            if current is not None:
+                match_id = f"{current.get('platformId')}_{current.get('gameId')}"
+                current = None
+                self._notify(target, on_game, None)
+                if self._fetch_finished(target, region_name, match_id):
+                    self._notify(target, on_finished, match_id)
+            delay = idle
+            idle = min(idle * self.BACKOFF, self.IDLE_MAX)
+
+    def _fetch_finished(self, target, region_name, match_id):
+        if match_store.has(match_id):
+            return True
+        match_base = get_match_api_url(region_name)
+        for _ in range(self.MATCH_ATTEMPTS):
+            if not self._sleep(target, self.MATCH_RETRY):
+                return False
+            try:
+                r = riot_get(
+                    f"{match_base}{match_id}?api_key={api_key}",
+                    timeout=20,
+                    priority=PRIORITY_BACKGROUND,
+                )
+            except Exception as e:
+                print(f"Finished match fetch failed: {e}")
+                continue
+            if r.status_code == 200:
+                ingest_raw(r.content)
+                return True
+            if r.status_code != 404:
+                print(f"Finished match {match_id} returned {r.status_code}")
+        return False
+
+
+live_game = LiveGameFollower()
+
+
+# --- Export ---
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORT_FORMATS = ["csv", "jsonl", "parquet"]
+
+# (column, type) - the type is only used for the parquet schema
+MATCH_COLUMNS = [
+    ("match_id", "str"),
+    ("platform_id", "str"),
+    ("game_version", "str"),
+    ("queue_id", "int"),
+    ("queue_name", "str"),
+    ("game_start", "int"),
+    ("game_duration", "int"),
+    ("winning_team", "int"),
+]
+PARTICIPANT_COLUMNS = [
+    ("match_id", "str"),
+    ("puuid", "str"),
+    ("riot_id", "str"),
+    ("team_id", "int"),
+    ("position", "str"),
+    ("champion_id", "int"),
+    ("champion", "str"),
+    ("win", "bool"),
+    ("kills", "int"),
+    ("deaths", "int"),
+    ("assists", "int"),
+    ("cs", "int"),
+    ("gold", "int"),
+    ("vision_score", "int"),
+    ("damage_to_champions", "int"),
+]
+TEAM_COLUMNS = [
+    ("match_id", "str"),
+    ("winning_team", "int"),
+    ("blue_kills", "int"),
+    ("red_kills", "int"),
+    ("blue_gold", "int"),
+    ("red_gold", "int"),
+    ("blue_cs", "int"),
+    ("red_cs", "int"),
+    ("blue_towers", "int"),
+    ("red_towers", "int"),
+    ("blue_dragons", "int"),
+    ("red_dragons", "int"),
+    ("blue_barons", "int"),
+    ("red_barons", "int"),
+    ("kill_diff", "int"),
+    ("gold_diff", "int"),
+]
+
+
+def match_export_rows(match_data):
+    """Flatten a match document into (match row, participant rows, team row)."""
+    info = match_data.get("info", {})
+    match_id = match_data.get("metadata", {}).get("matchId")
+    participants = info.get("participants", [])
+
+    winning_team = 0
+    for team in info.get("teams", []):
+        if team.get("win"):
+            winning_team = team.get("teamId", 0)
+
+    match_row = {
+        "match_id": match_id,
+        "platform_id": info.get("platformId"),
+        "game_version": info.get("gameVersion"),
+        "queue_id": info.get("queueId"),
+        "queue_name": static_data.queue_name(info.get("queueId", 0)),
+        "game_start": info.get("gameStartTimestamp"),
+        "game_duration": info.get("gameDuration"),
+        "winning_team": winning_team,
+    }
+
+    participant_rows = []
+    totals = {100: {"kills": 0, "gold": 0, "cs": 0}, 200: {"kills": 0, "gold": 0, "cs": 0}}
+    for p in participants:
+        cs = p.get("totalMinionsKilled", 0) + p.get("neutralMinionsKilled", 0)
+        game_name = p.get("riotIdGameName")
+        riot_id = f"{game_name}#{p.get('riotIdTagline', '')}" if game_name else None
+        participant_rows.append(
+            {
+                "match_id": match_id,
+                "puuid": p.get("puuid"),
+                "riot_id": riot_id,
+                "team_id": p.get("teamId"),
+                "position": p.get("teamPosition"),
+                "champion_id": p.get("championId"),
+                "champion": p.get("championName"),
+                "win": p.get("win"),
+                "kills": p.get("kills", 0),
+                "deaths": p.get("deaths", 0),
+                "assists": p.get("assists", 0),
+                "cs": cs,
+                "gold": p.get("goldEarned", 0),
+                "vision_score": p.get("visionScore", 0),
+                "damage_to_champions": p.get("totalDamageDealtToChampions", 0),
+            }
+        )
+        team_totals = totals.get(p.get("teamId"))
+        if team_totals is not None:
+            team_totals["kills"] += p.get("kills", 0)
+            team_totals["gold"] += p.get("goldEarned", 0)
+            team_totals["cs"] += cs
+
+    objectives = {100: {}, 200: {}}
+    for team in info.get("teams", []):
+        if team.get("teamId") in objectives:
+            objectives[team["teamId"]] = team.get("objectives", {})
+
+    def kills_of(team_id, objective):
+        return objectives[team_id].get(objective, {}).get("kills", 0)
+
+    team_row = {
+        "match_id": match_id,
+        "winning_team": winning_team,
+        "blue_kills": totals[100]["kills"],
+        "red_kills": totals[200]["kills"],
+        "blue_gold": totals[100]["gold"],
+        "red_gold": totals[200]["gold"],
+        "blue_cs": totals[100]["cs"],
+        "red_cs": totals[200]["cs"],
+        "blue_towers": kills_of(100, "tower"),
+        "red_towers": kills_of(200, "tower"),
+        "blue_dragons": kills_of(100, "dragon"),
+        "red_dragons": kills_of(200, "dragon"),
+        "blue_barons": kills_of(100, "baron"),
+        "red_barons": kills_of(200, "baron"),
+        "kill_diff": totals[100]["kills"] - totals[200]["kills"],
+        "gold_diff": totals[100]["gold"] - totals[200]["gold"],
+    }
+    return match_row, participant_rows, team_row
+
+
+class _CsvSink:
+    def __init__(self, path, columns):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=[c for c, _ in columns])
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+
+class _JsonlSink:
+    def __init__(self, path, columns):
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write(self, row):
+        self.file.write(json.dumps(row, separators=(",", ":")) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetSink:
+    """Buffers rows into fixed size row groups so memory stays flat."""
+
+    BATCH_SIZE = 5000
+
+    def __init__(self, path, columns):
+        types = {
+            "str": pyarrow.string(),
+            "int": pyarrow.int64(),
+            "float": pyarrow.float64(),
+            "bool": pyarrow.bool_(),
+        }
+        self.schema = pyarrow.schema([(c, types[t]) for c, t in columns])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.BATCH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self.rows:
+            table = pyarrow.Table.from_pylist(self.rows, schema=self.schema)
+            self.writer.write_table(table)
+            self.rows = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+EXPORT_SINKS = {"csv": _CsvSink, "jsonl": _JsonlSink, "parquet": _ParquetSink}
+
+
+def export_matches(matches, out_stem, fmt, progress=None):
+    """Stream match documents into <out_stem>_matches/_participants/_teams.<fmt>.
+
+    matches is any iterable of match documents, they're consumed one at a time.
+    Returns the number of matches written.
+    """
+    if fmt not in EXPORT_SINKS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == "parquet" and pyarrow is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow).")
+
+    sink_cls = EXPORT_SINKS[fmt]
+    sinks = []
+    count = 0
+    try:
+        for name, columns in [
+            ("matches", MATCH_COLUMNS),
+            ("participants", PARTICIPANT_COLUMNS),
+            ("teams", TEAM_COLUMNS),
+        ]:
+            sinks.append(sink_cls(f"{out_stem}_{name}.{fmt}", columns))
+        match_sink, participant_sink, team_sink = sinks
+
+        for match_data in matches:
+            match_row, participant_rows, team_row = match_export_rows(match_data)
+            match_sink.write(match_row)
+            for row in participant_rows:
+                participant_sink.write(row)
+            team_sink.write(team_row)
+            count += 1
+            if progress and count % 500 == 0:
+                progress(count)
+    finally:
+        for sink in sinks:
+            sink.close()
+    return count
 
 
 class APIManager:
@@ -140,7 +2505,7 @@ class APIManager:
 
         url = f"{self.account_base}by-riot-id/{username}/{tagline}?api_key={api_key}"
         print("Fetching User PUUID from {self.region_name}:", url)
-        response = requests.get(url)
+        response = riot_get(url, priority=PRIORITY_INTERACTIVE)
         response.raise_for_status()
         data = response.json()
         puuid = data.get("puuid")
@@ -150,24 +2515,25 @@ class APIManager:
         print("Stored user PUUID")
         return self.puuid_data
 
-    def fetch_matches(self):
+    def fetch_matches(self, priority=PRIORITY_INTERACTIVE):
         if not self.puuid_data:
             raise RuntimeError("puuid_data not set. Call fetch_puuid first.")
         print("Fetching matches from API")
-        response = requests.get(
-            f"{self.match_base}by-puuid/{self.puuid_data}/ids?start=0&count=20&api_key={api_key}"
+        response = riot_get(
+            f"{self.match_base}by-puuid/{self.puuid_data}/ids?start=0&count=20&api_key={api_key}",
+            priority=priority,
         )
         response.raise_for_status()
         self.match_data = response.json()
         print(f"Stored {len(self.match_data)} matches")
         return self.match_data
 
-    def fetch_rank_data(self):
+    def fetch_rank_data(self, priority=PRIORITY_INTERACTIVE):
         if not self.puuid_data:
             raise RuntimeError("puuid_data not set. Call fetch_puuid first.")
 
         url = f"{self.league_base}entries/by-puuid/{self.puuid_data}?api_key={api_key}"
-        response = requests.get(url)
+        response = riot_get(url, priority=priority)
 
         if response.status_code != 200:
             try:
@@ -179,6 +2545,7 @@ class APIManager:
             return self.rank_data
 
         data = response.json()
+        record_rank(self.puuid_data, data)
 
         if not data:
             self.rank_data = "Rank: Unranked"
@@ -206,7 +2573,10 @@ class APIManager:
 
     def fetch_match_data(self, query_string):
         print("Loading Search Function")
-        response = requests.get(f"{self.match_base}{query_string}?api_key={api_key}")
+        response = riot_get(
+            f"{self.match_base}{query_string}?api_key={api_key}",
+            priority=PRIORITY_INTERACTIVE,
+        )
         response.raise_for_status()
         self.specific_match = response.json()["metadata"]["participants"].index(
             self.puuid_data
@@ -228,7 +2598,7 @@ class APIManager:
         """Get match data with participants"""
         print("📊 Fetching match data...")
         url = f"{self.match_base}{self.specific_match}?api_key={api_key}"
-        response = requests.get(url)
+        response = riot_get(url, priority=PRIORITY_INTERACTIVE)
 
         if response.status_code == 200:
             return response.json()
@@ -244,6 +2614,414 @@ class APIManager:
         print("All data cleared from memory")
 
 
+# --- Match analysis ---
+
+TIER_VALUES = {
+    "IRON": 1,
+    "BRONZE": 2,
+    "SILVER": 3,
+    "GOLD": 4,
+    "PLATINUM": 5,
+    "EMERALD": 6,
+    "DIAMOND": 7,
+    "MASTER": 8,
+    "GRANDMASTER": 9,
+    "CHALLENGER": 10,
+}
+
+TIER_NAMES = [
+    "Iron",
+    "Bronze",
+    "Silver",
+    "Gold",
+    "Platinum",
+    "Emerald",
+    "Diamond",
+    "Master",
+    "Grandmaster",
+    "Challenger",
+]
+
+
+def parse_rank_entries(entries):
+    """Solo queue rank info from a league-v4 entries response."""
+    if not isinstance(entries, list) or not entries:
+        return {"full_rank": "Unranked"}
+    solo_queue = None
+    for entry in entries:
+        if entry.get("queueType") == "RANKED_SOLO_5x5":
+            solo_queue = entry
+            break
+    if not solo_queue:
+        return {"full_rank": "Unranked"}
+    tier = solo_queue.get("tier", "UNRANKED").title()
+    rank = solo_queue.get("rank", "")
+    lp = solo_queue.get("leaguePoints", 0)
+    return {
+        "tier": tier,
+        "rank": rank,
+        "lp": lp,
+        "wins": solo_queue.get("wins", 0),
+        "losses": solo_queue.get("losses", 0),
+        "full_rank": f"{tier} {rank} ({lp} LP)" if rank else f"{tier} ({lp} LP)",
+    }
+
+
+class PlayerLookupCache:
+    """Riot ID and rank per puuid, so a player is only looked up once.
+
+    Riot IDs don't change often and are kept for the session, ranks are kept
+    for RANK_TTL seconds. Failed lookups aren't cached.
+    """
+
+    RANK_TTL = 10 * 60
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._names = {}
+        self._ranks = {}  # puuid -> (fetched at, rank info)
+
+    def remember_name(self, puuid, riot_id):
+        with self._lock:
+            self._names[puuid] = riot_id
+
+    def remember_match_names(self, match_data):
+        """Match documents carry Riot IDs already, which saves the account lookup."""
+        for p in match_data.get("info", {}).get("participants", []):
+            if p.get("puuid") and p.get("riotIdGameName"):
+                tag_line = p.get("riotIdTagline", "")
+                game_name = p["riotIdGameName"]
+                self.remember_name(
+                    p["puuid"], f"{game_name}#{tag_line}" if tag_line else game_name
+                )
+
+    def cached_name(self, puuid):
+        return self._names.get(puuid)
+
+    def cached_rank(self, puuid):
+        cached = self._ranks.get(puuid)
+        if cached and time.time() - cached[0] < self.RANK_TTL:
+            return cached[1]
+        return None
+
+    def riot_id(self, account_base, puuid, priority=PRIORITY_INTERACTIVE):
+        name = self.cached_name(puuid)
+        if name:
+            return name
+        try:
+            r = riot_get(
+                f"{account_base}by-puuid/{puuid}?api_key={api_key}", priority=priority
+            )
+            if r.status_code != 200:
+                return f"Error {r.status_code}"
+            d = r.json()
+        except Exception:
+            return "Error"
+        game_name = d.get("gameName", "Unknown")
+        tag_line = d.get("tagLine", "")
+        name = f"{game_name}#{tag_line}" if tag_line else game_name
+        self.remember_name(puuid, name)
+        return name
+
+    def rank(self, league_base, puuid, priority=PRIORITY_INTERACTIVE):
+        rank_info = self.cached_rank(puuid)
+        if rank_info is not None:
+            return rank_info
+        try:
+            r = riot_get(
+                f"{league_base}entries/by-puuid/{puuid}",
+                headers={"X-Riot-Token": api_key},
+                priority=priority,
+            )
+            if r.status_code != 200:
+                return {"full_rank": f"Error {r.status_code}"}
+            entries = r.json()
+            rank_info = parse_rank_entries(entries)
+            record_rank(puuid, entries)
+        except Exception:
+            return {"full_rank": "Error"}
+        with self._lock:
+            self._ranks[puuid] = (time.time(), rank_info)
+        return rank_info
+
+
+player_cache = PlayerLookupCache()
+
+
+def calculate_team_stats(team_participants, ranked_info):
+    total_kills = 0
+    total_deaths = 0
+    total_assists = 0
+    rank_values = []
+
+    for p in team_participants:
+        puuid = p.get("puuid")
+        total_kills += p.get("kills", 0)
+        total_deaths += p.get("deaths", 0)
+        total_assists += p.get("assists", 0)
+
+        rank_data = ranked_info.get(puuid, {})
+        if "tier" in rank_data:
+            rank_values.append(TIER_VALUES.get(rank_data["tier"].upper(), 0))
+
+    avg_rank = sum(rank_values) / len(rank_values) if rank_values else 0
+    avg_kda = (total_kills + total_assists) / max(total_deaths, 1)
+
+    return {
+        "kills": total_kills,
+        "deaths": total_deaths,
+        "assists": total_assists,
+        "avg_kda": avg_kda,
+        "avg_rank": avg_rank,
+    }
+
+
+def _avg_tier_name(avg_rank):
+    return TIER_NAMES[int(avg_rank) - 1] if 1 <= avg_rank <= 10 else "Unknown"
+
+
+def team_comparison_lines(blue_avg_rank, red_avg_rank):
+    """The rank lines of TEAM COMPARISON, which change as ranks come in."""
+    advantage_rank = (
+        "Blue"
+        if blue_avg_rank > red_avg_rank
+        else "Red"
+        if red_avg_rank > blue_avg_rank
+        else "Even"
+    )
+    return [
+        f"🔵 Blue Team Avg Rank: ~{_avg_tier_name(blue_avg_rank)} ({blue_avg_rank:.1f})",
+        f"🔴 Red Team Avg Rank: ~{_avg_tier_name(red_avg_rank)} ({red_avg_rank:.1f})",
+        f"📈 Rank Advantage: {advantage_rank}",
+    ]
+
+
+# Output text tags of the cells Full Analysis fills in as lookups finish
+TEAM_COMPARISON_TAGS = ["avg_rank:100", "avg_rank:200", "rank_advantage"]
+NAME_WIDTH = 25
+RANK_WIDTH = 20
+
+
+def format_match_analysis(match_data, summoner_names, ranked_info, placeholder=None):
+    """Full Analysis text for one match.
+
+    Returns (out_lines, icon_rows, cells). icon_rows are (index into out_lines,
+    champion) for each player row. cells are (index into out_lines, column,
+    width, tag) for the name, rank and team comparison cells, width None
+    meaning the whole line. Players missing from summoner_names/ranked_info
+    show placeholder when it's given.
+    """
+    participants = match_data.get("info", {}).get("participants", [])
+    blue_team = [p for p in participants if p.get("teamId") == 100]
+    red_team = [p for p in participants if p.get("teamId") == 200]
+
+    blue_stats = calculate_team_stats(blue_team, ranked_info)
+    red_stats = calculate_team_stats(red_team, ranked_info)
+
+    out_lines = []
+    icon_rows = []
+    cells = []
+    queue_id = match_data.get("info", {}).get("queueId", 0)
+    queue_name = static_data.queue_name(queue_id)
+
+    out_lines.append("\n" + "=" * 90)
+    out_lines.append(f"MATCH ANALYSIS - {queue_name}")
+    out_lines.append("=" * 90 + "\n")
+
+    for label, team, stats in [
+        ("🔵 BLUE TEAM:", blue_team, blue_stats),
+        ("🔴 RED TEAM:", red_team, red_stats),
+    ]:
+        out_lines.append(label)
+        out_lines.append("-" * 90)
+        out_lines.append(
+            f"{'Player':<25} {'Champion':<15} {'K/D/A':<12} {'Rank':<20} {'CS':<6} {'Gold':<8}"
+        )
+        out_lines.append("-" * 90)
+
+        for p in team:
+            puuid = p.get("puuid")
+            summoner_name = summoner_names.get(puuid, placeholder or "Unknown")
+            champion = static_data.champion_display_name(
+                p.get("championName", "Unknown")
+            )
+            kills = p.get("kills", 0)
+            deaths = p.get("deaths", 0)
+            assists = p.get("assists", 0)
+            cs = p.get("totalMinionsKilled", 0) + p.get("neutralMinionsKilled", 0)
+            gold = p.get("goldEarned", 0)
+
+            if puuid in ranked_info or placeholder is None:
+                rank_display = ranked_info.get(puuid, {}).get("full_rank", "Unranked")
+            else:
+                rank_display = placeholder
+
+            name_cell = f"{summoner_name:<{NAME_WIDTH}}"
+            before_rank = f"{name_cell} {champion:<15} {f'{kills}/{deaths}/{assists}':<12} "
+            rank_cell = f"{rank_display:<{RANK_WIDTH}}"
+            icon_rows.append((len(out_lines), p.get("championName")))
+            cells.append((len(out_lines), 0, len(name_cell), f"name:{puuid}"))
+            cells.append(
+                (len(out_lines), len(before_rank), len(rank_cell), f"rank:{puuid}")
+            )
+            out_lines.append(f"{before_rank}{rank_cell} {cs:<6} {gold:<8,}")
+
+        team_name = "Blue" if team is blue_team else "Red"
+        out_lines.append(
+            f"\n📊 {team_name} Team Stats: Kills: {stats['kills']} | Deaths: {stats['deaths']} | Assists: {stats['assists']} | Avg KDA: {stats['avg_kda']:.2f}\n"
+        )
+
+    # Team comparison
+    out_lines.append("=" * 90)
+    out_lines.append("TEAM COMPARISON")
+    out_lines.append("-" * 90)
+
+    comparison = team_comparison_lines(blue_stats["avg_rank"], red_stats["avg_rank"])
+    for line, tag in zip(comparison, TEAM_COMPARISON_TAGS):
+        cells.append((len(out_lines), 0, None, tag))
+        out_lines.append(line)
+    advantage_kills = (
+        "Blue"
+        if blue_stats["kills"] > red_stats["kills"]
+        else "Red"
+        if red_stats["kills"] > blue_stats["kills"]
+        else "Even"
+    )
+    out_lines.append(f"⚔️  Kill Advantage: {advantage_kills}")
+
+    # Determine which team won (use first participant of one team)
+    winning_team = "Blue" if blue_team and blue_team[0].get("win") else "Red"
+    out_lines.append(f"🏆 Winning Team: {winning_team}")
+
+    out_lines.append("\n" + "=" * 90)
+    return out_lines, icon_rows, cells
+
+
+def format_live_game(game, summoner_names, ranked_info, placeholder=None):
+    """Live Game text, laid out like format_match_analysis.
+
+    Returns (out_lines, icon_rows, cells) in the same shape, so the names and
+    ranks can be patched in as they are looked up.
+    """
+    participants = game.get("participants", [])
+    out_lines = []
+    icon_rows = []
+    cells = []
+    queue_name = static_data.queue_name(game.get("gameQueueConfigId", 0))
+    start = game.get("gameStartTime") or 0
+    elapsed = int(time.time() - start / 1000) if start else game.get("gameLength", 0)
+
+    out_lines.append("\n" + "=" * 90)
+    out_lines.append(f"LIVE GAME - {queue_name} - {elapsed // 60}:{elapsed % 60:02d}")
+    out_lines.append("=" * 90 + "\n")
+
+    for label, team_id in [("🔵 BLUE TEAM:", 100), ("🔴 RED TEAM:", 200)]:
+        out_lines.append(label)
+        out_lines.append("-" * 90)
+        out_lines.append(f"{'Player':<{NAME_WIDTH}} {'Champion':<15} {'Rank':<20}")
+        out_lines.append("-" * 90)
+        for p in participants:
+            if p.get("teamId") != team_id:
+                continue
+            puuid = p.get("puuid")
+            summoner_name = summoner_names.get(puuid, placeholder or "Unknown")
+            champ = static_data.champion(p.get("championId"))
+            champion_name = champ["id"] if champ else None
+            champion = static_data.champion_display_name(p.get("championId"))
+            if puuid in ranked_info or placeholder is None:
+                rank_display = ranked_info.get(puuid, {}).get("full_rank", "Unranked")
+            else:
+                rank_display = placeholder
+
+            name_cell = f"{summoner_name:<{NAME_WIDTH}}"
+            before_rank = f"{name_cell} {champion:<15} "
+            icon_rows.append((len(out_lines), champion_name))
+            cells.append((len(out_lines), 0, len(name_cell), f"name:{puuid}"))
+            cells.append(
+                (len(out_lines), len(before_rank), RANK_WIDTH, f"rank:{puuid}")
+            )
+            out_lines.append(f"{before_rank}{rank_display:<{RANK_WIDTH}}")
+        out_lines.append("")
+
+    out_lines.append("=" * 90)
+    return out_lines, icon_rows, cells
+
+
+def format_batch_summary(matches, puuid, unique_players, api_calls):
+    """Combined summary of puuid's games for Analyze All."""
+    games = wins = kills = deaths = assists = cs = gold = 0
+    champions = defaultdict(lambda: [0, 0])  # champion -> [games, wins]
+    for match_data in matches:
+        for p in match_data.get("info", {}).get("participants", []):
+            if p.get("puuid") != puuid:
+                continue
+            games += 1
+            wins += 1 if p.get("win") else 0
+            kills += p.get("kills", 0)
+            deaths += p.get("deaths", 0)
+            assists += p.get("assists", 0)
+            cs += p.get("totalMinionsKilled", 0) + p.get("neutralMinionsKilled", 0)
+            gold += p.get("goldEarned", 0)
+            champ = champions[p.get("championName", "Unknown")]
+            champ[0] += 1
+            champ[1] += 1 if p.get("win") else 0
+
+    out_lines = ["=" * 90, f"COMBINED SUMMARY - {len(matches)} matches", "-" * 90]
+    if games:
+        out_lines.append(
+            f"Record: {wins}W {games - wins}L ({wins / games:.0%})  |  "
+            f"Avg K/D/A: {kills / games:.1f}/{deaths / games:.1f}/{assists / games:.1f}  |  "
+            f"KDA: {(kills + assists) / max(deaths, 1):.2f}"
+        )
+        out_lines.append(f"Avg CS: {cs / games:.0f}  |  Avg Gold: {gold / games:,.0f}")
+        out_lines.append("Champions:")
+        for name, (played, won) in sorted(champions.items(), key=lambda c: -c[1][0]):
+            display = static_data.champion_display_name(name)
+            out_lines.append(f"  {display:<15} {played} games, {won / played:.0%} wins")
+    out_lines.append(
+        f"Player lookups: {api_calls} API calls for {unique_players} unique players "
+        f"(one match at a time would be up to {len(matches) * 20})"
+    )
+    out_lines.append("=" * 90)
+    return out_lines
+
+
+# How often queued cell updates are applied to the analysis output
+PATCH_INTERVAL_MS = 100
+
+
+def profiled(action):
+    """Run an App worker under the profiler when it's armed."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if profiler.remaining <= 0:
+                return func(self, *args, **kwargs)
+            capture = profiler.begin(action)
+            if capture is None:
+                return func(self, *args, **kwargs)
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                profiler.end(capture)
+                # Wait for the worker's queued UI updates (and the last patch
+                # flush) so their time is counted, then write the files here
+                # rather than on the Tk thread
+                flushed = threading.Event()
+                self.root.after(PATCH_INTERVAL_MS, flushed.set)
+                flushed.wait(5)
+                self._profile_done(capture)
+
+        return wrapper
+
+    return decorator
+
+
+# Filter bar periods in days
+FILTER_PERIODS = {"All time": None, "Today": 1, "7 days": 7, "30 days": 30}
+
+
 class App:
     def __init__(self, root: tk.Tk):
         self.root = root
@@ -251,8 +3029,26 @@ class App:
         self.root.geometry("920x720")
         self.api_manager = None
         self.output_visible = False
+        self.icon_cache = ChampionIconCache(root, static_data)
+        # Icons shown in the text widgets, kept referenced so LRU eviction can't blank them
+        self._output_icons = []
+        self._output_generation = 0
+        self._details_icons = []
+        self._details_generation = 0
+        # Progressive Full Analysis output, see show_analysis/patch_output
+        self._progressive_render = None
+        self._progressive_generation = None
+        self._cell_widths = {}
+        self._patch_lock = threading.Lock()
+        self._pending_render = None
+        self._pending_patches = {}
+        self._patch_scheduled = False
+        match_watcher.subscribe(self._on_watched_match)
+        self.session = load_session()
         self.create_menu_bar()
         self._build_ui()
+        if self.session:
+            self.restore_session()
 
     def create_menu_bar(self):
         menubar = Menu(self.root)
@@ -261,12 +3057,39 @@ class App:
         # file
         file_menu = Menu(menubar, tearoff=0)
         menubar.add_cascade(label="File", menu=file_menu)
+        file_menu.add_command(label="Export...", command=self.on_export)
+        file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.quit)
 
         # settings
         settings_menu = Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Settings", menu=settings_menu)
         settings_menu.add_command(label="Clear Data", command=self.clear_cache)
+        settings_menu.add_separator()
+        self.watch_var = tk.BooleanVar(value=match_watcher.running)
+        settings_menu.add_checkbutton(
+            label="Watch Mode", variable=self.watch_var, command=self.on_toggle_watch
+        )
+        settings_menu.add_command(
+            label="Watch This Player", command=self.on_watch_player
+        )
+        settings_menu.add_command(
+            label="Stop Watching This Player", command=self.on_unwatch_player
+        )
+        settings_menu.add_separator()
+        settings_menu.add_command(
+            label="Update Static Data", command=self.on_update_static_data
+        )
+        settings_menu.add_separator()
+        self.profiling_var = tk.BooleanVar(value=False)
+        settings_menu.add_checkbutton(
+            label="Profiling",
+            variable=self.profiling_var,
+            command=self.on_toggle_profiling,
+        )
+        settings_menu.add_command(
+            label="Profiling Results", command=self.show_profiling_results
+        )
 
         # help menu
         help_menu = Menu(menubar, tearoff=0)
@@ -274,14 +3097,139 @@ class App:
         help_menu.add_command(label="About", command=self.show_about)
         help_menu.add_command(label="Source", command=self.open_documentation)
 
+    def on_toggle_watch(self):
+        if self.watch_var.get():
+            match_watcher.start()
+            self.set_status(f"Watching {len(match_watcher.players)} players")
+        else:
+            match_watcher.stop()
+            self.set_status("Watch mode off")
+
+    def on_watch_player(self):
+        puuid = self._get_puuid()
+        if not puuid:
+            messagebox.showinfo("No user", "Enter a username")
+            return
+        matches = self.api_manager.match_data or []
+        match_watcher.track(
+            puuid,
+            current_region,
+            name=f"{username}#{tagline}",
+            last_match=matches[0] if matches else None,
+        )
+        if not match_watcher.running:
+            self.watch_var.set(True)
+            match_watcher.start()
+        self.set_status(f"Watching {username}#{tagline}")
+
+    def on_unwatch_player(self):
+        puuid = self._get_puuid()
+        if puuid and match_watcher.is_tracked(puuid):
+            match_watcher.untrack(puuid)
+            self.set_status(f"Stopped watching {username}#{tagline}")
+
+    def _on_watched_match(self, puuid, name, match_ids):
+        # Called on the watcher thread
+        self.append_details(f"New match for {name}: {', '.join(match_ids)}")
+
+        def _add():
+            if puuid != self._get_puuid():
+                return
+            known = self.api_manager.match_data or []
+            fresh = [m for m in match_ids if m not in known]
+            self.api_manager.match_data = (fresh + known)[:20]
+            for i, match_id in enumerate(fresh):
+                self.match_listbox.insert(i, match_id)
+
+        self.root.after(0, _add)
+
+    def on_toggle_profiling(self):
+        if not self.profiling_var.get():
+            profiler.disarm()
+            self.set_status("Profiling off")
+            return
+        count = simpledialog.askinteger(
+            "Profiling",
+            "Profile how many of the next actions?",
+            initialvalue=5,
+            minvalue=1,
+            maxvalue=100,
+            parent=self.root,
+        )
+        if not count:
+            self.profiling_var.set(False)
+            return
+        profiler.arm(count)
+        self.set_status(f"Profiling the next {count} actions")
+
+    def _profile_done(self, capture):
+        # Called on the worker thread
+        try:
+            summary = profiler.finish(capture)
+        except Exception as e:
+            self.append_details(f"Error writing profile: {e}")
+            return
+        if profiler.remaining <= 0:
+            self._schedule(lambda: self.profiling_var.set(False))
+        wall = summary.splitlines()[1]
+        self.set_status(f"Profiled {capture.action}: {wall} (saved to {PROFILES_DIR})")
+
+    def show_profiling_results(self):
+        if not profiler.summaries:
+            messagebox.showinfo(
+                "Profiling", "Nothing profiled yet, turn on Settings > Profiling."
+            )
+            return
+        separator = "\n\n" + "=" * 90 + "\n\n"
+        self.set_output_text(separator.join(reversed(profiler.summaries)))
+
     def clear_cache(self):
         if messagebox.askyesno(
             "Clear Data", "Are you sure you want to clear all cached data?"
         ):
+            live_game.stop()
             if self.api_manager:
                 self.api_manager.clear_data()
+            clear_session()
+            self.session = None
             self.on_clear()
 
+    def on_export(self):
+        file_types = [("CSV", "csv"), ("JSON Lines", "jsonl"), ("Parquet", "parquet")]
+        # The chosen type decides the format when no extension is typed,
+        # defaultextension would force .csv whatever type was picked
+        type_var = tk.StringVar(value=file_types[0][0])
+        path = filedialog.asksaveasfilename(
+            title="Export stored matches",
+            filetypes=[(label, f"*.{fmt}") for label, fmt in file_types],
+            typevariable=type_var,
+        )
+        if not path:
+            return
+        out_stem, ext = os.path.splitext(path)
+        fmt = ext.lstrip(".").lower()
+        if fmt not in EXPORT_FORMATS:
+            fmt = dict(file_types).get(type_var.get(), "csv")
+            out_stem = path
+        self.set_status("Exporting matches...")
+        t_worker = threading.Thread(
+            target=self._worker_export, args=(out_stem, fmt), daemon=True
+        )
+        t_worker.start()
+
+    def _worker_export(self, out_stem, fmt):
+        try:
+            count = export_matches(
+                match_store.iter_matches(),
+                out_stem,
+                fmt,
+                progress=lambda n: self.set_status(f"Exported {n} matches..."),
+            )
+            self.set_status(f"Exported {count} matches to {out_stem}_*.{fmt}")
+        except Exception as e:
+            self.append_details(f"Error exporting: {e}")
+            self.set_status("Error")
+
     def show_about(self):
         about_text = f"Simple League Tool {app_version}"
         messagebox.showinfo("About", about_text)
@@ -289,6 +3237,19 @@ class App:
     def open_documentation(self):
         webbrowser.open("https://github.com/iAmAvi-lol/simplelolapi")
 
+    def on_update_static_data(self):
+        self.set_status("Updating static data...")
+        t_worker = threading.Thread(target=self._worker_update_static_data, daemon=True)
+        t_worker.start()
+
+    def _worker_update_static_data(self):
+        try:
+            static_data.refresh()
+            self.set_status(f"Static data {static_data.version} loaded")
+        except Exception as e:
+            self.append_details(f"Error updating static data: {e}")
+            self.set_status("Error")
+
     def _build_ui(self):
         frm = ttk.Frame(self.root, padding=10)
         frm.pack(fill="both", expand=True)
@@ -367,6 +3328,62 @@ class App:
             left, text="Double-click a match to view details:", font=("Arial", 9)
         ).pack(anchor="w", pady=(0, 5))
 
+        # Filter bar, queries the local match index
+        filter_frame = ttk.Frame(left)
+        filter_frame.pack(fill="x", pady=(0, 5))
+
+        ttk.Label(filter_frame, text="Champion:").grid(row=0, column=0, sticky="w")
+        self.filter_champion_entry = ttk.Entry(filter_frame, width=12)
+        self.filter_champion_entry.grid(row=0, column=1, sticky="ew", padx=(2, 8))
+
+        ttk.Label(filter_frame, text="Queue:").grid(row=0, column=2, sticky="w")
+        self.filter_queue_var = tk.StringVar(value="Any")
+        self.filter_queue_dropdown = ttk.Combobox(
+            filter_frame,
+            textvariable=self.filter_queue_var,
+            values=["Any"],
+            width=16,
+            state="readonly",
+            postcommand=self._update_filter_queues,
+        )
+        self.filter_queue_dropdown.grid(row=0, column=3, sticky="ew", padx=(2, 0))
+
+        ttk.Label(filter_frame, text="With:").grid(row=1, column=0, sticky="w")
+        self.filter_teammate_entry = ttk.Entry(filter_frame, width=12)
+        self.filter_teammate_entry.grid(row=1, column=1, sticky="ew", padx=(2, 8))
+
+        ttk.Label(filter_frame, text="Result:").grid(row=1, column=2, sticky="w")
+        self.filter_result_var = tk.StringVar(value="Any")
+        ttk.Combobox(
+            filter_frame,
+            textvariable=self.filter_result_var,
+            values=["Any", "Win", "Loss"],
+            width=16,
+            state="readonly",
+        ).grid(row=1, column=3, sticky="ew", padx=(2, 0))
+
+        ttk.Label(filter_frame, text="Period:").grid(row=2, column=0, sticky="w")
+        self.filter_period_var = tk.StringVar(value="All time")
+        ttk.Combobox(
+            filter_frame,
+            textvariable=self.filter_period_var,
+            values=list(FILTER_PERIODS.keys()),
+            width=10,
+            state="readonly",
+        ).grid(row=2, column=1, sticky="ew", padx=(2, 8))
+
+        filter_buttons = ttk.Frame(filter_frame)
+        filter_buttons.grid(row=2, column=2, columnspan=2, sticky="e", pady=(2, 0))
+        self.filter_btn = ttk.Button(
+            filter_buttons, text="Filter", command=self.on_filter_matches
+        )
+        self.filter_btn.pack(side="left", padx=(0, 5))
+        ttk.Button(
+            filter_buttons, text="Reset", command=self.on_reset_filter
+        ).pack(side="left")
+        filter_frame.columnconfigure(1, weight=1)
+        filter_frame.columnconfigure(3, weight=1)
+
         # Frame for listbox and scrollbar
         list_frame = ttk.Frame(left)
         list_frame.pack(fill="both", expand=True, pady=(0, 10))
@@ -404,7 +3421,24 @@ class App:
             text="Full Analysis",
             command=self.on_analyze_selected_match,
         )
-        self.analyze_btn.pack(side="left")
+        self.analyze_btn.pack(side="left", padx=(0, 5))
+
+        self.analyze_all_btn = ttk.Button(
+            button_container,
+            text="Analyze All",
+            command=self.on_analyze_all_matches,
+        )
+        self.analyze_all_btn.pack(side="left", padx=(0, 5))
+
+        self.duos_btn = ttk.Button(
+            button_container, text="Duos & Rivals", command=self.on_show_duos
+        )
+        self.duos_btn.pack(side="left", padx=(0, 5))
+
+        self.live_btn = ttk.Button(
+            button_container, text="Live Game", command=self.on_live_game
+        )
+        self.live_btn.pack(side="left")
 
         # Right panel - Details
         right = ttk.LabelFrame(main, text="Details View", padding=10)
@@ -430,26 +3464,75 @@ class App:
 
     # --- UI helpers ---
 
+    def _schedule(self, func, delay_ms=0):
+        capture = profiler.current()
+        if capture is not None:
+            func = capture.timed("ui", func)
+        self.root.after(delay_ms, func)
+
     def set_status(self, msg: str):
-        self.root.after(0, lambda: self.status_label.config(text=msg))
+        self._schedule(lambda: self.status_label.config(text=msg))
 
     def set_details(self, text: str):
         def _set():
+            self._details_generation += 1
+            self._details_icons = []
             self.details_text.config(state="normal")
             self.details_text.delete("1.0", "end")
             self.details_text.insert("1.0", text)
             self.details_text.config(state="disabled")
 
-        self.root.after(0, _set)
+        self._schedule(_set)
 
-    def append_details(self, text: str):
+    def append_details(self, text: str, champion: str = None):
         def _append():
             self.details_text.config(state="normal")
+            start = self.details_text.index("end-1c")
             self.details_text.insert("end", text + "\n")
             self.details_text.see("end")
             self.details_text.config(state="disabled")
+            if champion:
+                # Icon goes in front of the "Champion:" line of the appended block
+                offset = text.find("Champion:")
+                line = int(start.split(".")[0]) + text.count("\n", 0, max(offset, 0))
+                self._request_icon(
+                    self.details_text,
+                    self._details_icons,
+                    lambda: self._details_generation,
+                    f"{line}.0",
+                    champion,
+                )
 
-        self.root.after(0, _append)
+        self._schedule(_append)
+
+    def _request_icon(self, widget, keep, current_generation, index, champion):
+        """Insert a champion icon at index once it's decoded (Tk thread only)."""
+        generation = current_generation()
+
+        def _insert(image):
+            if generation != current_generation():
+                return  # the text was replaced while the icon was loading
+            widget.config(state="normal")
+            widget.image_create(index, image=image, padx=2)
+            widget.config(state="disabled")
+            keep.append(image)
+
+        self.icon_cache.get(champion, _insert)
+
+    def add_output_icons(self, rows):
+        """rows: (line number, champion name) pairs in the current output text."""
+
+        def _add():
+            for line, champion in rows:
+                self._request_icon(
+                    self.output_text,
+                    self._output_icons,
+                    lambda: self._output_generation,
+                    f"{line}.0",
+                    champion,
+                )
+
+        self._schedule(_add)
 
     def set_output_text(self, text: str):
         def _set():
@@ -457,12 +3540,14 @@ class App:
             if not self.output_visible:
                 self.output_frame.pack(fill="both", expand=False, pady=(8, 0))
                 self.output_visible = True
+            self._output_generation += 1
+            self._output_icons = []
             self.output_text.config(state="normal")
             self.output_text.delete("1.0", "end")
             self.output_text.insert("1.0", text)
             self.output_text.config(state="disabled")
 
-        self.root.after(0, _set)
+        self._schedule(_set)
 
     def append_output(self, text: str):
         def _append():
@@ -474,7 +3559,7 @@ class App:
             self.output_text.see("end")
             self.output_text.config(state="disabled")
 
-        self.root.after(0, _append)
+        self._schedule(_append)
 
     def populate_matches(self, matches):
         def _populate():
@@ -482,21 +3567,25 @@ class App:
             for m in matches:
                 self.match_listbox.insert("end", m)
 
-        self.root.after(0, _populate)
+        self._schedule(_populate)
 
     def enable_controls(self, enable: bool = True):
         def _set():
             state = "normal" if enable else "disabled"
             self.fetch_btn.config(state=state)
+            self.filter_btn.config(state=state)
             self.clear_btn.config(state=state)
             self.show_btn.config(state=state)
             self.refresh_btn.config(state=state)
             self.analyze_btn.config(state=state)
+            self.analyze_all_btn.config(state=state)
+            self.duos_btn.config(state=state)
+            self.live_btn.config(state=state)
             e_state = "normal" if enable else "disabled"
             self.user_tag_entry.config(state=e_state)
             self.region_dropdown.config(state="readonly" if enable else "disabled")
 
-        self.root.after(0, _set)
+        self._schedule(_set)
 
     def _get_puuid(self):
         if not self.api_manager:
@@ -507,7 +3596,87 @@ class App:
 
     # --- Actions ---
 
+    def _update_filter_queues(self):
+        self._filter_queue_ids = {
+            static_data.queue_name(q): q for q in match_index.queue_ids()
+        }
+        self.filter_queue_dropdown.config(
+            values=["Any"] + list(self._filter_queue_ids.keys())
+        )
+
+    def on_filter_matches(self):
+        puuid = self._get_puuid()
+        queue_id = None
+        queue_choice = self.filter_queue_var.get()
+        if queue_choice != "Any":
+            queue_id = getattr(self, "_filter_queue_ids", {}).get(queue_choice)
+
+        teammate = None
+        teammate_raw = self.filter_teammate_entry.get().strip()
+        if teammate_raw:
+            teammate = match_index.puuid_for_riot_id(teammate_raw)
+            if not teammate:
+                messagebox.showinfo(
+                    "Unknown player",
+                    f"{teammate_raw} isn't in any stored match (use Name#Tag).",
+                )
+                return
+
+        result = self.filter_result_var.get()
+        win = None if result == "Any" or not puuid else result == "Win"
+
+        since = None
+        days = FILTER_PERIODS.get(self.filter_period_var.get())
+        if days is not None:
+            since = int((time.time() - days * 86400) * 1000)
+
+        matches = match_index.query(
+            puuid=puuid,
+            champion=self.filter_champion_entry.get().strip() or None,
+            queue_id=queue_id,
+            teammate=teammate,
+            win=win,
+            since=since,
+        )
+        self.populate_matches(matches)
+        self.set_status(f"{len(matches)} stored matches match the filter")
+
+    def on_show_duos(self):
+        puuid = self._get_puuid()
+        if not puuid:
+            messagebox.showinfo("No user", "Enter a username")
+            return
+
+        def name_of(other):
+            return match_index.names.get(other, other[:12] + "...")
+
+        out_lines = ["=" * 60, f"DUO PARTNERS - {username}#{tagline}", "-" * 60]
+        out_lines.append(f"{'Player':<30} {'Games':<8} {'Win Rate':<8}")
+        for other, games, wins in co_graph.top_partners(puuid):
+            out_lines.append(f"{name_of(other):<30} {games:<8} {wins / games:.0%}")
+        out_lines.append("")
+        out_lines.append("FREQUENT OPPONENTS")
+        out_lines.append("-" * 60)
+        out_lines.append(f"{'Player':<30} {'Games':<8} {'Win Rate vs':<8}")
+        for other, games, wins in co_graph.top_opponents(puuid):
+            out_lines.append(f"{name_of(other):<30} {games:<8} {wins / games:.0%}")
+        out_lines.append("=" * 60)
+        self.set_output_text("\n".join(out_lines))
+        stored = len(match_index.by_puuid.get(puuid, ()))
+        self.set_status(f"Based on {stored} stored matches")
+
+    def on_reset_filter(self):
+        self.filter_champion_entry.delete(0, "end")
+        self.filter_teammate_entry.delete(0, "end")
+        self.filter_queue_var.set("Any")
+        self.filter_result_var.set("Any")
+        self.filter_period_var.set("All time")
+        matches = self.api_manager.match_data if self.api_manager else None
+        self.populate_matches(matches or [])
+        self.set_status("Filter cleared")
+
     def on_clear(self):
+        live_game.stop()
         self.user_tag_entry.delete(0, "end")
         self.match_listbox.delete(0, "end")
         self.set_details("")
@@ -557,6 +3726,9 @@ class App:
             messagebox.showerror("Invalid Region", "Please select a valid region.")
             return
 
+        # The followed live game belongs to the previous user
+        live_game.stop()
+
         # set module-level username/tagline/region for APIManager
         global username, tagline, current_region
         username = u
@@ -564,13 +3736,22 @@ class App:
         current_region = selected_region
 
         try:
-            manager = APIManager()
+            manager = APIManager(selected_region)
         except Exception as e:
             messagebox.showerror(
                 "APIManager Error", f"Could not create APIManager: {e}"
             )
             return
 
+        session = self.session
+        if (
+            session
+            and session["region"] == selected_region
+            and f"{session['username']}#{session['tagline']}".lower()
+            == f"{u}#{t}".lower()
+        ):
+            manager.puuid_data = session["puuid"]
+
         # assign the manager and start background fetch
         self.api_manager = manager
         self.enable_controls(False)
@@ -578,6 +3759,7 @@ class App:
         t_worker = threading.Thread(target=self._worker_fetch_user, daemon=True)
         t_worker.start()
 
+    @profiled("fetch_user")
     def _worker_fetch_user(self):
         if not self.api_manager:
             self.set_details("Internal error: API not available.")
@@ -586,20 +3768,15 @@ class App:
             return
 
         try:
-            puuid = self.api_manager.fetch_puuid()
+            # A PUUID from the saved session is reused, it never changes
+            puuid = self.api_manager.puuid_data or self.api_manager.fetch_puuid()
             self.set_status("Fetched PUUID, fetching rank...")
             rank = self.api_manager.fetch_rank_data()
             self.set_status("Fetched rank, fetching matches...")
             matches = self.api_manager.fetch_matches()
-            puuid_val = self._get_puuid() or puuid
-            self.set_details(
-                f"Region: {current_region}\n"
-                f"User: {username}#{tagline}\n"
-                f"PUUID: {puuid_val}\n"
-                f"Rank: {rank}\n"
-                f"Matches: {len(matches)}"
-            )
+            self.show_user_details(rank, matches)
             self.populate_matches(matches)
+            self._save_session()
             self.set_status("Ready")
         except Exception as e:
             self.set_details(f"Error: {e}")
@@ -607,6 +3784,95 @@ class App:
         finally:
             self.enable_controls(True)
 
+    def show_user_details(self, rank, matches, note=""):
+        puuid = self._get_puuid()
+        trend = rank_sparkline(puuid) if puuid else None
+        self.set_details(
+            f"Region: {current_region}\n"
+            f"User: {username}#{tagline}\n"
+            f"PUUID: {puuid}\n"
+            f"Rank: {rank}\n"
+            + (f"LP 30d: {trend}\n" if trend else "")
+            + f"Matches: {len(matches)}{note}"
+        )
+
+    def _save_session(self):
+        try:
+            self.session = save_session(
+                current_region,
+                username,
+                tagline,
+                self._get_puuid(),
+                self.api_manager.rank_data,
+                self.api_manager.match_data or [],
+            )
+        except OSError as e:
+            print(f"Could not save session: {e}")
+
+    def restore_session(self):
+        """Show the last session's user straight away, then refresh it in the background."""
+        global username, tagline, current_region
+        session = self.session
+        username = session["username"]
+        tagline = session["tagline"]
+        current_region = session["region"]
+        self.region_var.set(current_region)
+        self.user_tag_entry.insert(0, f"{username}#{tagline}")
+
+        manager = APIManager(current_region)
+        manager.puuid_data = session["puuid"]
+        manager.rank_data = session.get("rank")
+        manager.match_data = session.get("matches") or []
+        self.api_manager = manager
+
+        saved = time.strftime("%Y-%m-%d %H:%M", time.localtime(session["saved_at"]))
+        self.show_user_details(
+            manager.rank_data, manager.match_data, f"\n(saved {saved}, updating...)"
+        )
+        self.populate_matches(manager.match_data)
+        self.set_status("Restored last session, checking for updates...")
+        t_worker = threading.Thread(
+            target=self._worker_revalidate, args=(manager,), daemon=True
+        )
+        t_worker.start()
+
+    def _worker_load_local_data(self):
+        """Load the index, graph, benchmarks and watch list once the window is up."""
+        try:
+            match_index.load()
+            co_graph.load(match_index)
+            benchmarks.load(match_store)
+            benchmarks.start()
+            match_index.catch_up(match_store)
+            match_watcher.load()
+            if match_watcher.players:
+                match_watcher.start()
+                self._schedule(lambda: self.watch_var.set(True))
+        except Exception as e:
+            print(f"Loading stored data failed: {e}")
+
+    def _worker_revalidate(self, manager):
+        old_rank = manager.rank_data
+        old_matches = list(manager.match_data or [])
+        try:
+            # Nobody clicked for this, so it shouldn't hold up anything they do
+            rank = manager.fetch_rank_data(priority=PRIORITY_NORMAL)
+            matches = manager.fetch_matches(priority=PRIORITY_NORMAL)
+        except Exception as e:
+            self.set_status(f"Showing saved data, update failed: {e}")
+            return
+        if manager is not self.api_manager:
+            return  # the user moved on to someone else meanwhile
+        if matches != old_matches:
+            self.populate_matches(matches)
+        self.show_user_details(rank, matches)
+        self._save_session()
+        if rank != old_rank or matches != old_matches:
+            new_count = len([m for m in matches if m not in old_matches])
+            self.set_status(f"Updated: {new_count} new matches")
+        else:
+            self.set_status("Ready - saved data is up to date")
+
     def on_refresh_matches(self):
         if not self.api_manager or not self._get_puuid():
             messagebox.showinfo("No user", "Enter a username")
@@ -625,6 +3891,7 @@ class App:
         try:
             matches = self.api_manager.fetch_matches()
             self.populate_matches(matches)
+            self._save_session()
             self.set_status("Matches refreshed")
         except Exception as e:
             self.append_details(f"Error refreshing matches: {e}")
@@ -646,6 +3913,7 @@ class App:
         self.set_status(f"Loading match {match_id}...")
         t_worker.start()
 
+    @profiled("show_match")
     def _worker_show_match(self, match_id: str):
         if not self.api_manager:
             self.append_details("Internal error: API manager not available.")
@@ -658,10 +3926,7 @@ class App:
             if not puuid_val:
                 raise RuntimeError("PUUID not available for the selected user.")
 
-            match_base = self.api_manager.match_base
-            resp = requests.get(f"{match_base}{match_id}?api_key={api_key}", timeout=15)
-            resp.raise_for_status()
-            data = resp.json()
+            data = load_match(match_id, self.api_manager.match_base)
 
             participants = data.get("metadata", {}).get("participants", [])
             try:
@@ -677,7 +3942,9 @@ class App:
             pretty.append("=" * 60)
             pretty.append(f"Match ID: {match_id}")
             pretty.append(f"Player: {username}#{tagline}")
-            pretty.append(f"Champion: {my_part.get('championName')}")
+            pretty.append(
+                f"Champion: {static_data.champion_display_name(my_part.get('championName'))}"
+            )
             pretty.append(f"Victory: {my_part.get('win')}")
             pretty.append(
                 f"K/D/A: {my_part.get('kills')}/{my_part.get('deaths')}/{my_part.get('assists')}"
@@ -685,8 +3952,9 @@ class App:
             pretty.append(f"Vision Score: {my_part.get('visionScore')}")
             pretty.append(f"Gold Earned: {my_part.get('goldEarned')}")
             pretty.append(f"Damage Dealt: {my_part.get('totalDamageDealtToChampions')}")
+            pretty.extend(benchmarks.lines(data, puuid_val))
             pretty.append("=" * 60)
-            self.append_details("\n".join(pretty))
+            self.append_details("\n".join(pretty), champion=my_part.get("championName"))
             self.set_status("Match loaded")
         except Exception as e:
             self.append_details(f"Error loading match: {e}")
@@ -713,6 +3981,7 @@ class App:
         self.set_status(f"Analyzing match {match_id}...")
         t_worker.start()
 
+    @profiled("analyze_match")
     def _worker_analyze_match(self, match_id: str):
         try:
             if not self.api_manager:
@@ -723,9 +3992,7 @@ class App:
             league_base = self.api_manager.league_base
             account_base = self.api_manager.account_base
             # Fetch match data
-            resp = requests.get(f"{match_base}{match_id}?api_key={api_key}", timeout=20)
-            resp.raise_for_status()
-            match_data = resp.json()
+            match_data = load_match(match_id, match_base, timeout=20)
 
             participants = match_data.get("info", {}).get("participants", [])
             puuids = [p.get("puuid") for p in participants if p.get("puuid")]
@@ -734,258 +4001,433 @@ class App:
                 self.set_status("Error")
                 return
 
-            # Map puuids -> Riot IDs (gameName#tagLine)
+            # Draw the tables straight away with whatever is cached, then fill
+            # in names and ranks as each lookup comes back
+            player_cache.remember_match_names(match_data)
             summoner_names = {}
-            for i, puuid in enumerate(puuids):
-                try:
-                    time.sleep(0.1)  # small rate limiting
-                    url = f"{account_base}by-puuid/{puuid}?api_key={api_key}"
-                    r = requests.get(url, timeout=10)
-                    if r.status_code == 200:
-                        d = r.json()
-                        game_name = d.get("gameName", "Unknown")
-                        tag_line = d.get("tagLine", "")
-                        summoner_names[puuid] = (
-                            f"{game_name}#{tag_line}" if tag_line else game_name
-                        )
-                    else:
-                        summoner_names[puuid] = f"Error {r.status_code}"
-                except Exception:
-                    summoner_names[puuid] = "Error"
-
-            # Get ranked info per puuid
             ranked_info = {}
-            headers = {"X-Riot-Token": api_key}
-            for i, puuid in enumerate(puuids):
-                try:
-                    time.sleep(0.2)  # rate limiting
-                    url = f"{league_base}{puuid}"
-                    r = requests.get(url, headers=headers, timeout=10)
-                    if r.status_code == 200:
-                        entries = r.json()
-                        if isinstance(entries, list) and len(entries) > 0:
-                            solo_queue = None
-                            for entry in entries:
-                                if entry.get("queueType") == "RANKED_SOLO_5x5":
-                                    solo_queue = entry
-                                    break
-                            if solo_queue:
-                                tier = solo_queue.get("tier", "UNRANKED").title()
-                                rank = solo_queue.get("rank", "")
-                                lp = solo_queue.get("leaguePoints", 0)
-                                wins = solo_queue.get("wins", 0)
-                                losses = solo_queue.get("losses", 0)
-                                ranked_info[puuid] = {
-                                    "tier": tier,
-                                    "rank": rank,
-                                    "lp": lp,
-                                    "wins": wins,
-                                    "losses": losses,
-                                    "full_rank": f"{tier} {rank} ({lp} LP)"
-                                    if rank
-                                    else f"{tier} ({lp} LP)",
-                                }
-                            else:
-                                ranked_info[puuid] = {"full_rank": "Unranked"}
-                        else:
-                            ranked_info[puuid] = {"full_rank": "Unranked"}
-                    else:
-                        ranked_info[puuid] = {"full_rank": f"Error {r.status_code}"}
-                except Exception:
-                    ranked_info[puuid] = {"full_rank": "Error"}
-
-            # 4) Calculate team stats (blue team teamId==100, red==200)
-            def calculate_team_stats(team_participants):
-                total_kills = 0
-                total_deaths = 0
-                total_assists = 0
-                rank_values = []
-
-                tier_values = {
-                    "IRON": 1,
-                    "BRONZE": 2,
-                    "SILVER": 3,
-                    "GOLD": 4,
-                    "PLATINUM": 5,
-                    "EMERALD": 6,
-                    "DIAMOND": 7,
-                    "MASTER": 8,
-                    "GRANDMASTER": 9,
-                    "CHALLENGER": 10,
-                }
-
-                for p in team_participants:
-                    puuid = p.get("puuid")
-                    total_kills += p.get("kills", 0)
-                    total_deaths += p.get("deaths", 0)
-                    total_assists += p.get("assists", 0)
-
-                    rank_data = ranked_info.get(puuid, {})
-                    if "tier" in rank_data:
-                        rank_values.append(
-                            tier_values.get(rank_data["tier"].upper(), 0)
-                        )
-
-                avg_rank = sum(rank_values) / len(rank_values) if rank_values else 0
-                avg_kda = (total_kills + total_assists) / max(total_deaths, 1)
-
-                return {
-                    "kills": total_kills,
-                    "deaths": total_deaths,
-                    "assists": total_assists,
-                    "avg_kda": avg_kda,
-                    "avg_rank": avg_rank,
-                }
-
-            blue_team = [p for p in participants if p.get("teamId") == 100]
-            red_team = [p for p in participants if p.get("teamId") == 200]
-
-            blue_stats = calculate_team_stats(blue_team)
-            red_stats = calculate_team_stats(red_team)
+            for puuid in puuids:
+                name = player_cache.cached_name(puuid)
+                if name:
+                    summoner_names[puuid] = name
+                rank_info = player_cache.cached_rank(puuid)
+                if rank_info is not None:
+                    ranked_info[puuid] = rank_info
+
+            out_lines, icon_rows, cells = format_match_analysis(
+                match_data, summoner_names, ranked_info, placeholder="..."
+            )
+            render = self.show_analysis(out_lines, icon_rows, cells)
+
+            for puuid in puuids:
+                if puuid not in summoner_names:
+                    summoner_names[puuid] = player_cache.riot_id(account_base, puuid)
+                    self.patch_output(
+                        render, {f"name:{puuid}": summoner_names[puuid]}
+                    )
+
+            # Team averages are kept as running sums per team
+            team_of = {p.get("puuid"): p.get("teamId") for p in participants}
+            rank_sums = {100: 0, 200: 0}
+            rank_counts = {100: 0, 200: 0}
+
+            def add_rank(puuid):
+                tier = ranked_info[puuid].get("tier")
+                team_id = team_of.get(puuid)
+                if tier and team_id in rank_sums:
+                    rank_sums[team_id] += TIER_VALUES.get(tier.upper(), 0)
+                    rank_counts[team_id] += 1
+
+            def team_avg(team_id):
+                if not rank_counts[team_id]:
+                    return 0
+                return rank_sums[team_id] / rank_counts[team_id]
+
+            for puuid in ranked_info:
+                add_rank(puuid)
+            for puuid in puuids:
+                if puuid in ranked_info:
+                    continue
+                ranked_info[puuid] = player_cache.rank(league_base, puuid)
+                add_rank(puuid)
+                updates = dict(
+                    zip(
+                        TEAM_COMPARISON_TAGS,
+                        team_comparison_lines(team_avg(100), team_avg(200)),
+                    )
+                )
+                updates[f"rank:{puuid}"] = ranked_info[puuid].get(
+                    "full_rank", "Unranked"
+                )
+                self.patch_output(render, updates)
 
-            out_lines = []
-            queue_id = match_data.get("info", {}).get("queueId", 0)
-            queue_names = {
-                420: "Ranked Solo/Duo",
-                440: "Ranked Flex",
-                400: "Normal Draft",
-                430: "Normal Blind",
-                450: "ARAM",
-            }
-            queue_name = queue_names.get(queue_id, f"Queue {queue_id}")
+            user_puuid = self._get_puuid()
+            if user_puuid in ranked_info:
+                lines = benchmarks.lines(
+                    match_data, user_puuid, ranked_info[user_puuid].get("tier")
+                )
+                if lines:
+                    self.append_output(
+                        f"📈 {username}#{tagline} vs stored games:\n" + "\n".join(lines)
+                    )
+            self.set_status("Analysis complete")
+        except Exception as e:
+            self.append_output(f"Error analyzing match: {e}")
+            self.set_status("Error")
+        finally:
+            self.enable_controls(True)
 
-            out_lines.append("\n" + "=" * 90)
-            out_lines.append(f"MATCH ANALYSIS - {queue_name}")
-            out_lines.append("=" * 90 + "\n")
+    def show_analysis(self, out_lines, icon_rows, cells=()):
+        """Show analysis lines in the output, returns a handle for patch_output."""
+        final_output = "\n".join(out_lines)
+        self.set_output_text(final_output)
+
+        # Line numbers of the player rows, entries in out_lines can span lines
+        line_starts = []
+        line = 1
+        for entry in out_lines:
+            line_starts.append(line)
+            line += entry.count("\n") + 1
+
+        render = object()
+        tagged = [(line_starts[i], col, width, tag) for i, col, width, tag in cells]
+
+        def _tag():
+            # Runs right after the text is set, before any icon shifts columns
+            self._progressive_render = render
+            self._progressive_generation = self._output_generation
+            self._cell_widths = {}
+            for line, col, width, tag in tagged:
+                if width is None:
+                    self.output_text.tag_add(tag, f"{line}.0", f"{line}.0 lineend")
+                else:
+                    end = f"{line}.{col + width}"
+                    self.output_text.tag_add(tag, f"{line}.{col}", end)
+                self._cell_widths[tag] = width
+
+        self._schedule(_tag)
+        self.add_output_icons(
+            [(line_starts[i], champ) for i, champ in icon_rows if champ]
+        )
+        return render
+
+    def patch_output(self, render, updates):
+        """Replace tagged cells of a shown analysis, {tag: text}.
+
+        Updates from the worker are collected and applied together on a short
+        timer, so a burst of lookups costs a few Tk callbacks rather than one
+        per cell.
+        """
+        with self._patch_lock:
+            if self._pending_render is not render:
+                self._pending_patches = {}
+                self._pending_render = render
+            self._pending_patches.update(updates)
+            if self._patch_scheduled:
+                return
+            self._patch_scheduled = True
+        self._schedule(self._flush_patches, PATCH_INTERVAL_MS)
+
+    def _flush_patches(self):
+        with self._patch_lock:
+            render = self._pending_render
+            updates = self._pending_patches
+            self._pending_patches = {}
+            self._patch_scheduled = False
+        if (
+            render is not self._progressive_render
+            or self._progressive_generation != self._output_generation
+        ):
+            return  # the output has been replaced since
+        self.output_text.config(state="normal")
+        for tag, text in updates.items():
+            width = self._cell_widths.get(tag)
+            ranges = self.output_text.tag_ranges(tag)
+            if width is not None:
+                text = f"{text:<{width}}"
+            for start, end in zip(ranges[0::2], ranges[1::2]):
+                self.output_text.delete(start, end)
+                self.output_text.insert(start, text, (tag,))
+        self.output_text.config(state="disabled")
+
+    def on_live_game(self):
+        puuid = self._get_puuid()
+        if not puuid:
+            messagebox.showinfo("No user", "Enter a username")
+            return
+        name = f"{username}#{tagline}"
+        self.set_output_text(f"Looking for {name}'s live game...\n")
+        t_worker = threading.Thread(
+            target=self._worker_live_game,
+            args=(puuid, current_region, name),
+            daemon=True,
+        )
+        self.enable_controls(False)
+        self.set_status("Checking live game...")
+        t_worker.start()
 
-            out_lines.append("🔵 BLUE TEAM:")
-            out_lines.append("-" * 90)
-            out_lines.append(
-                f"{'Player':<25} {'Champion':<15} {'K/D/A':<12} {'Rank':<20} {'CS':<6} {'Gold':<8}"
-            )
-            out_lines.append("-" * 90)
-
-            for p in blue_team:
-                puuid = p.get("puuid")
-                summoner_name = summoner_names.get(puuid, "Unknown")
-                champion = p.get("championName", "Unknown")
-                kills = p.get("kills", 0)
-                deaths = p.get("deaths", 0)
-                assists = p.get("assists", 0)
-                cs = p.get("totalMinionsKilled", 0) + p.get("neutralMinionsKilled", 0)
-                gold = p.get("goldEarned", 0)
-
-                rank_data = ranked_info.get(puuid, {})
-                rank_display = rank_data.get("full_rank", "Unranked")
-
-                out_lines.append(
-                    f"{summoner_name:<25} {champion:<15} {f'{kills}/{deaths}/{assists}':<12} {rank_display:<20} {cs:<6} {gold:,}<8"
+    @profiled("live_game")
+    def _worker_live_game(self, puuid, region_name, name):
+        try:
+            game = fetch_active_game(region_name, puuid)
+            if game is None:
+                self.set_output_text(
+                    f"{name} is not in a game. The game will show here when one starts.\n"
                 )
-
-            out_lines.append(
-                f"\n📊 Blue Team Stats: Kills: {blue_stats['kills']} | Deaths: {blue_stats['deaths']} | Assists: {blue_stats['assists']} | Avg KDA: {blue_stats['avg_kda']:.2f}\n"
+                self.set_status("Not in a game")
+            else:
+                self._show_live_game(game, region_name, PRIORITY_INTERACTIVE)
+                self.set_status("Live game loaded")
+
+            def on_game(game):
+                if game is None:
+                    self.set_status(f"{name}'s game ended, waiting for the match...")
+                else:
+                    self._show_live_game(game, region_name, PRIORITY_BACKGROUND)
+
+            live_game.follow(
+                puuid,
+                region_name,
+                game,
+                on_game=on_game,
+                on_finished=lambda match_id: self._on_watched_match(
+                    puuid, name, [match_id]
+                ),
             )
+        except Exception as e:
+            self.append_output(f"Error loading live game: {e}")
+            self.set_status("Error")
+        finally:
+            self.enable_controls(True)
 
-            out_lines.append("🔴 RED TEAM:")
-            out_lines.append("-" * 90)
-            out_lines.append(
-                f"{'Player':<25} {'Champion':<15} {'K/D/A':<12} {'Rank':<20} {'CS':<6} {'Gold':<8}"
-            )
-            out_lines.append("-" * 90)
-
-            for p in red_team:
-                puuid = p.get("puuid")
-                summoner_name = summoner_names.get(puuid, "Unknown")
-                champion = p.get("championName", "Unknown")
-                kills = p.get("kills", 0)
-                deaths = p.get("deaths", 0)
-                assists = p.get("assists", 0)
-                cs = p.get("totalMinionsKilled", 0) + p.get("neutralMinionsKilled", 0)
-                gold = p.get("goldEarned", 0)
-
-                rank_data = ranked_info.get(puuid, {})
-                rank_display = rank_data.get("full_rank", "Unranked")
-
-                out_lines.append(
-                    f"{summoner_name:<25} {champion:<15} {f'{kills}/{deaths}/{assists}':<12} {rank_display:<20} {cs:<6} {gold:,}<8"
+    def _show_live_game(self, game, region_name, priority):
+        """Show a live game with cached names and ranks, then fill in the rest."""
+        participants = [p for p in game.get("participants", []) if p.get("puuid")]
+        summoner_names = {}
+        ranked_info = {}
+        for p in participants:
+            puuid = p["puuid"]
+            if p.get("riotId"):
+                player_cache.remember_name(puuid, p["riotId"])
+            name = player_cache.cached_name(puuid)
+            if name:
+                summoner_names[puuid] = name
+            rank_info = player_cache.cached_rank(puuid)
+            if rank_info is not None:
+                ranked_info[puuid] = rank_info
+
+        out_lines, icon_rows, cells = format_live_game(
+            game, summoner_names, ranked_info, placeholder="..."
+        )
+        render = self.show_analysis(out_lines, icon_rows, cells)
+
+        account_base = get_account_api_url(region_name)
+        league_base = get_league_api_url(region_name)
+        for p in participants:
+            puuid = p["puuid"]
+            updates = {}
+            if puuid not in summoner_names:
+                updates[f"name:{puuid}"] = player_cache.riot_id(
+                    account_base, puuid, priority
                 )
+            if puuid not in ranked_info:
+                updates[f"rank:{puuid}"] = player_cache.rank(
+                    league_base, puuid, priority
+                ).get("full_rank", "Unranked")
+            if updates:
+                self.patch_output(render, updates)
+
+    def on_analyze_all_matches(self):
+        match_ids = list(self.match_listbox.get(0, "end"))
+        if not match_ids:
+            messagebox.showinfo("No matches", "Fetch a user's matches first")
+            return
+        if not self.api_manager:
+            messagebox.showinfo("No user", "Enter a username")
+            return
+        self.set_output_text(f"Analyzing {len(match_ids)} matches...\n")
+        t_worker = threading.Thread(
+            target=self._worker_analyze_all, args=(match_ids,), daemon=True
+        )
+        self.enable_controls(False)
+        self.set_status(f"Analyzing {len(match_ids)} matches...")
+        t_worker.start()
 
-            out_lines.append(
-                f"\n📊 Red Team Stats: Kills: {red_stats['kills']} | Deaths: {red_stats['deaths']} | Assists: {red_stats['assists']} | Avg KDA: {red_stats['avg_kda']:.2f}\n"
-            )
+    @profiled("analyze_all")
+    def _worker_analyze_all(self, match_ids):
+        try:
+            match_base = self.api_manager.match_base
+            league_base = self.api_manager.league_base
+            account_base = self.api_manager.account_base
 
-            # Team comparison
-            out_lines.append("=" * 90)
-            out_lines.append("TEAM COMPARISON")
-            out_lines.append("-" * 90)
-
-            tier_names = [
-                "Iron",
-                "Bronze",
-                "Silver",
-                "Gold",
-                "Platinum",
-                "Emerald",
-                "Diamond",
-                "Master",
-                "Grandmaster",
-                "Challenger",
-            ]
-            blue_avg_tier = (
-                tier_names[int(blue_stats["avg_rank"]) - 1]
-                if 1 <= blue_stats["avg_rank"] <= 10
-                else "Unknown"
-            )
-            red_avg_tier = (
-                tier_names[int(red_stats["avg_rank"]) - 1]
-                if 1 <= red_stats["avg_rank"] <= 10
-                else "Unknown"
-            )
+            matches = []
+            for i, match_id in enumerate(match_ids):
+                self.set_status(f"Loading match {i + 1}/{len(match_ids)}...")
+                try:
+                    matches.append(
+                        load_match(
+                            match_id, match_base, timeout=20, priority=PRIORITY_NORMAL
+                        )
+                    )
+                except Exception as e:
+                    self.append_output(f"Skipping {match_id}: {e}")
+
+            # Every player is resolved once, however many of the matches they're in
+            unique_puuids = []
+            seen = set()
+            for match_data in matches:
+                player_cache.remember_match_names(match_data)
+                for p in match_data.get("info", {}).get("participants", []):
+                    puuid = p.get("puuid")
+                    if puuid and puuid not in seen:
+                        seen.add(puuid)
+                        unique_puuids.append(puuid)
 
-            out_lines.append(
-                f"🔵 Blue Team Avg Rank: ~{blue_avg_tier} ({blue_stats['avg_rank']:.1f})"
-            )
-            out_lines.append(
-                f"🔴 Red Team Avg Rank: ~{red_avg_tier} ({red_stats['avg_rank']:.1f})"
-            )
-            advantage_rank = (
-                "Blue"
-                if blue_stats["avg_rank"] > red_stats["avg_rank"]
-                else "Red"
-                if red_stats["avg_rank"] > blue_stats["avg_rank"]
-                else "Even"
+            # Counted here rather than in the cache, which other threads use too
+            api_calls = 0
+            summoner_names = {}
+            ranked_info = {}
+            for i, puuid in enumerate(unique_puuids):
+                if i % 10 == 0:
+                    self.set_status(
+                        f"Looking up players {i + 1}/{len(unique_puuids)}..."
+                    )
+                if player_cache.cached_name(puuid) is None:
+                    api_calls += 1
+                summoner_names[puuid] = player_cache.riot_id(
+                    account_base, puuid, priority=PRIORITY_NORMAL
+                )
+                if player_cache.cached_rank(puuid) is None:
+                    api_calls += 1
+                ranked_info[puuid] = player_cache.rank(
+                    league_base, puuid, priority=PRIORITY_NORMAL
+                )
+
+            out_lines = []
+            icon_rows = []
+            for match_data in matches:
+                match_lines, match_icons, _ = format_match_analysis(
+                    match_data, summoner_names, ranked_info
+                )
+                offset = len(out_lines)
+                out_lines.append(f"Match ID: {match_data['metadata']['matchId']}")
+                offset += 1
+                icon_rows.extend((offset + i, champ) for i, champ in match_icons)
+                out_lines.extend(match_lines)
+            out_lines.extend(
+                format_batch_summary(
+                    matches, self._get_puuid(), len(unique_puuids), api_calls
+                )
             )
-            advantage_kills = (
-                "Blue"
-                if blue_stats["kills"] > red_stats["kills"]
-                else "Red"
-                if red_stats["kills"] > blue_stats["kills"]
-                else "Even"
+            self.show_analysis(out_lines, icon_rows)
+            self.set_status(
+                f"Analyzed {len(matches)} matches, {api_calls} player lookups"
             )
-            out_lines.append(f"📈 Rank Advantage: {advantage_rank}")
-            out_lines.append(f"⚔️  Kill Advantage: {advantage_kills}")
-
-            # Determine which team won (use first participant of one team)
-            winning_team = "Blue" if blue_team and blue_team[0].get("win") else "Red"
-            out_lines.append(f"🏆 Winning Team: {winning_team}")
-
-            out_lines.append("\n" + "=" * 90)
-
-            final_output = "\n".join(out_lines)
-            self.set_output_text(final_output)
-            self.set_status("Analysis complete")
         except Exception as e:
-            self.append_output(f"Error analyzing match: {e}")
+            self.append_output(f"Error analyzing matches: {e}")
             self.set_status("Error")
         finally:
             self.enable_controls(True)
 
 
+def run_export(args):
+    match_index.load()
+    match_index.catch_up(match_store)
+    if args.puuid:
+        match_ids = match_index.query(puuid=args.puuid)
+    else:
+        match_ids = match_store.ids()
+    print(f"Exporting {len(match_ids)} matches as {args.format}...")
+    count = export_matches(
+        match_store.iter_matches(match_ids),
+        args.out,
+        args.format,
+        progress=lambda n: print(f"  {n} matches"),
+    )
+    print(f"Wrote {count} matches to {args.out}_*.{args.format}")
+
+
+def run_watch(args):
+    match_index.load()
+    co_graph.load(match_index)
+    match_index.catch_up(match_store)
+    benchmarks.load(match_store)
+    benchmarks.start()
+    match_watcher.load()
+    for riot_id in args.add or []:
+        name, _, tag = riot_id.rpartition("#")
+        if not name or not tag:
+            print(f"Skipping {riot_id}, use Name#Tag")
+            continue
+        account_base = get_account_api_url(args.region)
+        response = riot_get(
+            f"{account_base}by-riot-id/{name}/{tag}?api_key={api_key}",
+            priority=PRIORITY_INTERACTIVE,
+        )
+        response.raise_for_status()
+        match_watcher.track(response.json()["puuid"], args.region, name=riot_id)
+        print(f"Now watching {riot_id}")
+    if not match_watcher.players:
+        print("Nobody to watch, add players with --add Name#Tag")
+        return
+
+    def report(puuid, name, match_ids):
+        stamp = time.strftime("%H:%M:%S")
+        print(f"{stamp} New match for {name}: {', '.join(match_ids)}")
+
+    match_watcher.subscribe(report)
+    match_watcher.start()
+    print(f"Watching {len(match_watcher.players)} players, Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        match_watcher.stop()
+        benchmarks.stop()
+        benchmarks.save_if_dirty()
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Simple League Tool")
+    commands = parser.add_subparsers(dest="command")
+    export_parser = commands.add_parser(
+        "export", help="Export stored matches without opening the GUI"
+    )
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    export_parser.add_argument(
+        "--out", default="export", help="Output path prefix (default: export)"
+    )
+    export_parser.add_argument("--puuid", help="Only matches with this player")
+    watch_parser = commands.add_parser(
+        "watch", help="Watch tracked players for new matches without the GUI"
+    )
+    watch_parser.add_argument(
+        "--add", nargs="*", metavar="NAME#TAG", help="Players to start watching"
+    )
+    watch_parser.add_argument(
+        "--region", choices=list(REGION_DATA.keys()), default=DEFAULT_REGION
+    )
+    args = parser.parse_args()
+
+    static_data.load()
+    if args.command == "export":
+        run_export(args)
+        return
+    if args.command == "watch":
+        run_watch(args)
+        return
+
+    # The window and the last session come first, stored data loads behind them
     root = tk.Tk()
     app = App(root)
+    analytics_pool.warm()
+    threading.Thread(target=app._worker_load_local_data, daemon=True).start()
     root.mainloop()
+    benchmarks.stop()
+    benchmarks.save_if_dirty()
+    analytics_pool.shutdown()
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,53 @@
+import json
+import random
+
+import main
+
+
+def filled_sketch(values, k=200, seed=0):
+    sketch = main.QuantileSketch(k, random.Random(seed))
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+def test_exact_while_nothing_is_compacted():
+    sketch = filled_sketch(range(100))
+    assert sketch.rank(-1) == 0.0
+    assert sketch.rank(49) == 0.5
+    assert sketch.rank(99) == 1.0
+
+
+def test_rank_error_is_small():
+    rng = random.Random(1)
+    values = [rng.gauss(7, 1.5) for _ in range(100_000)]
+    sketch = filled_sketch(values)
+    ordered = sorted(values)
+    for q in [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]:
+        assert abs(sketch.rank(ordered[int(q * len(ordered))]) - q) < 0.02
+
+
+def test_memory_stays_bounded():
+    sketch = filled_sketch(random.Random(2).random() for _ in range(200_000))
+    assert sketch.n == 200_000
+    assert sum(len(level) for level in sketch.levels) < 4 * sketch.k
+
+
+def test_json_round_trip_keeps_ranks_and_keeps_adding():
+    rng = random.Random(3)
+    sketch = filled_sketch(rng.random() for _ in range(20_000))
+    data = json.loads(json.dumps(sketch.to_json()))
+    copy = main.QuantileSketch.from_json(data, random.Random(4))
+    assert copy.n == sketch.n
+    assert copy.levels == sketch.levels
+    for value in [0.1, 0.5, 0.9]:
+        assert copy.rank(value) == sketch.rank(value)
+    for _ in range(20_000):
+        copy.add(rng.random())
+    assert copy.n == 40_000
+    assert abs(copy.rank(0.5) - 0.5) < 0.02
+
+
+def test_same_seed_same_sketch():
+    values = [random.Random(5).random() for _ in range(10_000)]
+    assert filled_sketch(values, seed=6).levels == filled_sketch(values, seed=6).levels
@@ -0,0 +1,106 @@
+import random
+
+import pytest
+
+import main
+
+QUEUE = "RANKED_SOLO_5x5"
+
+
+@pytest.mark.parametrize(
+    "value", [0, 1, -1, 63, -64, 64, 127, 128, 300, -300, 2**31, -(2**31), 2**40]
+)
+def test_varint_round_trip(value):
+    out = bytearray()
+    main._write_varint(out, value)
+    decoded, pos = main._read_varint(out, 0)
+    assert decoded == value
+    assert pos == len(out)
+
+
+def test_small_deltas_take_one_byte():
+    for value in range(-64, 64):
+        out = bytearray()
+        main._write_varint(out, value)
+        assert len(out) == 1
+
+
+def make_history(tmp_path, count, seed=0):
+    rng = random.Random(seed)
+    history = main.RankHistory(str(tmp_path))
+    expected = []
+    ts, tier, division, lp = 1_700_000_000, 3, 0, 50
+    for i in range(count):
+        ts += rng.randint(600, 9000)
+        lp += rng.choice([-20, 0, 22])
+        if lp >= 100:
+            lp -= 100
+            division += 1
+        if division > 3:
+            division = 0
+            tier += 1
+        lp = max(lp, 0)
+        stored = history.record(
+            "p",
+            QUEUE,
+            main.RANK_TIERS[tier],
+            main.RANK_DIVISIONS[division],
+            lp,
+            i,
+            i // 2,
+            ts=ts,
+        )
+        if stored:
+            expected.append((ts, tier, division, lp, i, i // 2))
+    return history, expected
+
+
+def test_full_range_round_trips_across_keyframes(tmp_path):
+    _, expected = make_history(tmp_path, 300)
+    assert len(expected) > 2 * main.RankHistory.KEYFRAME_EVERY
+    # A fresh instance only has what's on disk
+    assert main.RankHistory(str(tmp_path)).range("p", QUEUE) == expected
+
+
+def test_range_includes_the_sample_in_effect_at_since(tmp_path):
+    _, expected = make_history(tmp_path, 300)
+    history = main.RankHistory(str(tmp_path))
+    for i in [0, 1, 63, 64, 65, 150, 299]:
+        since = expected[i][0] - 1
+        until = expected[min(i + 40, len(expected) - 1)][0]
+        before = [s for s in expected if s[0] < since][-1:]
+        inside = [s for s in expected if since <= s[0] <= until]
+        assert history.range("p", QUEUE, since=since, until=until) == before + inside
+
+
+def test_unchanged_sample_is_not_stored(tmp_path):
+    history = main.RankHistory(str(tmp_path))
+    assert history.record("p", QUEUE, "GOLD", "II", 40, 10, 8, ts=100)
+    assert not history.record("p", QUEUE, "GOLD", "II", 40, 10, 8, ts=200)
+    reloaded = main.RankHistory(str(tmp_path))
+    assert not reloaded.record("p", QUEUE, "GOLD", "II", 40, 10, 8, ts=300)
+    assert reloaded.latest("p", QUEUE) == (100, 3, 2, 40, 10, 8)
+
+
+def test_appends_continue_after_reload(tmp_path):
+    history, expected = make_history(tmp_path, 100)
+    reloaded = main.RankHistory(str(tmp_path))
+    ts = expected[-1][0] + 60
+    assert reloaded.record("p", QUEUE, "CHALLENGER", "I", 900, 1, 1, ts=ts)
+    assert main.RankHistory(str(tmp_path)).range("p", QUEUE) == expected + [
+        (ts, 9, 3, 900, 1, 1)
+    ]
+
+
+def test_torn_last_record_is_ignored(tmp_path):
+    _, expected = make_history(tmp_path, 20)
+    bin_path = tmp_path / f"p_{QUEUE}.bin"
+    with open(bin_path, "ab") as f:
+        f.write(b"\x00\x80")
+    assert main.RankHistory(str(tmp_path)).range("p", QUEUE) == expected
+
+
+def test_unknown_series_is_empty(tmp_path):
+    history = main.RankHistory(str(tmp_path))
+    assert history.range("nobody", QUEUE) == []
+    assert history.latest("nobody", QUEUE) is None